@@ -0,0 +1,387 @@
+"""
+🚨 ANOMALY ENGINE
+Seasonal robust z-scores per location. Each (state, district) series gets a
+median level, every calendar month a national seasonal index, and rows are
+scored by how far they sit from level × season in units of the location's
+median absolute deviation. Everything is grouped array math, one pass per
+measure, so it scales to millions of rows. A streaming scorer keeps
+compact running state per location for feeds that arrive month by month,
+and an Isolation Forest mode scores rows across all numeric features
+"""
+
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import IsolationForest
+from threadpoolctl import threadpool_limits
+
+from clustering_engine import select_features
+from feature_matrix import build_feature_matrix
+
+# Measures scored when present in the frame
+ANOMALY_MEASURES = ['enrolments', 'success_rate', 'demographic_updates', 'biometric_updates']
+
+# Series are located by these columns
+GROUP_COLUMNS = ['state', 'district']
+
+# |robust z| at or above this flags a row (Iglewicz & Hoaglin's 3.5)
+ROBUST_Z_THRESHOLD = 3.5
+
+# Locations with fewer observations get no baseline and are never flagged
+MIN_PERIODS = 6
+
+# MAD -> standard deviation for normal data
+_MAD_SCALE = 0.6745
+
+
+def _group_median(values, codes):
+    """Per-row median of values within its group (NaN ignored)"""
+    return pd.Series(values).groupby(codes).transform('median').to_numpy()
+
+
+def robust_zscores(values, groups, seasons, prior_weight=MIN_PERIODS):
+    """Seasonal robust z-score of every value
+
+    groups are integer location codes, seasons the calendar period of each
+    row. The expected value is the location's median times the season's
+    national index (median over locations of value / location median), so
+    a spike confined to one state does not move its own baseline.
+    Residuals are relative to the expected value; each location's MAD is
+    shrunk toward the national MAD with prior_weight pseudo-observations,
+    so short series with a lucky tiny spread do not flag ordinary noise.
+    """
+    values = np.asarray(values, dtype='float64')
+    level = _group_median(values, groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(level != 0, values / level, np.nan)
+        season = np.nan_to_num(_group_median(ratio, seasons), nan=1.0)
+        expected = level * season
+        residual = np.where(expected != 0, (values - expected) / np.abs(expected), np.nan)
+
+    centre = _group_median(residual, groups)
+    deviation = np.abs(residual - centre)
+    mad = _group_median(deviation, groups)
+    pooled = np.nanmedian(deviation) if np.isfinite(deviation).any() else 0.0
+    n_obs = pd.Series(deviation).groupby(groups).transform('count').to_numpy()
+    mad = np.nan_to_num(mad, nan=pooled)
+    spread = np.sqrt((n_obs * mad ** 2 + prior_weight * pooled ** 2) / (n_obs + prior_weight)) / _MAD_SCALE
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(spread > 0, (residual - centre) / spread, 0.0)
+    return np.nan_to_num(z, nan=0.0)
+
+
+def detect_anomalies(df, measures=None, threshold=ROBUST_Z_THRESHOLD, date_column='date'):
+    """is_anomaly (0/1), anomaly_score (0-1) and the strongest z per row of df
+
+    Each measure is scored with robust_zscores over the state/district
+    series; a row's score is its largest |z| across measures, mapped to
+    |z| / (|z| + threshold) so the flag boundary sits at 0.5.
+    Returns a frame aligned with df (same index).
+    """
+    measures = [m for m in (measures or ANOMALY_MEASURES) if m in df.columns]
+    group_cols = [col for col in GROUP_COLUMNS if col in df.columns]
+    n_rows = len(df)
+
+    if group_cols:
+        groups = df.groupby(group_cols, observed=True, sort=False).ngroup().to_numpy()
+    else:
+        groups = np.zeros(n_rows, dtype=np.int64)
+    seasons = pd.to_datetime(df[date_column]).dt.month.to_numpy() if date_column in df.columns \
+        else np.zeros(n_rows, dtype=np.int64)
+
+    counts = np.bincount(groups[groups >= 0], minlength=groups.max() + 1 if n_rows else 0)
+    scored = (groups >= 0) & (counts[np.maximum(groups, 0)] >= MIN_PERIODS) if n_rows \
+        else np.zeros(0, dtype=bool)
+
+    strongest = np.zeros(n_rows)
+    for measure in measures:
+        values = df[measure].to_numpy(dtype='float64', na_value=np.nan)
+        z = robust_zscores(values, groups, seasons)
+        strongest = np.where(np.abs(z) > np.abs(strongest), z, strongest)
+    strongest = np.where(scored, strongest, 0.0)
+
+    magnitude = np.abs(strongest)
+    return pd.DataFrame({
+        'is_anomaly': (magnitude >= threshold).astype(np.int64),
+        'anomaly_score': magnitude / (magnitude + threshold),
+        'anomaly_z': strongest
+    }, index=df.index)
+
+
+def score_anomalies(df, measures=None, threshold=ROBUST_Z_THRESHOLD):
+    """df with is_anomaly / anomaly_score replaced by detect_anomalies()"""
+    scores = detect_anomalies(df, measures, threshold)
+    return df.assign(is_anomaly=scores['is_anomaly'], anomaly_score=scores['anomaly_score'])
+
+
+# ========== STREAMING SCORER ==========
+
+DEFAULT_STREAM_PATH = os.path.join("data", "models", "streaming", "anomaly_state.joblib")
+
+# Weight of the newest observation in the running level / variance
+STREAM_ALPHA = 0.1
+
+# Weight of the newest observation in a location's seasonal factor
+STREAM_SEASON_BETA = 0.2
+
+# Observations a location needs before its rows are scored
+STREAM_WARMUP = 6
+
+
+class StreamingAnomalyScorer:
+    """Online per-(state, district) scorer with O(1) work per new row
+
+    Each location keeps, per measure, an exponentially weighted mean and
+    variance of its deseasonalized value and twelve multiplicative
+    month-of-year factors, plus the last date it has seen. A row is scored
+    against that state before it is folded in; flagged values are folded
+    in winsorized at the threshold, so one spike does not inflate the
+    baseline. The whole state is a handful of arrays and is snapshotted
+    to disk, so a restart resumes without replaying history.
+    """
+
+    def __init__(self, measures=None, alpha=STREAM_ALPHA, season_beta=STREAM_SEASON_BETA,
+                 warmup=STREAM_WARMUP, threshold=ROBUST_Z_THRESHOLD):
+        self.measures = list(measures or ANOMALY_MEASURES)
+        self.alpha = alpha
+        self.season_beta = season_beta
+        self.warmup = warmup
+        self.threshold = threshold
+        self.slots = {}
+        n_measures = len(self.measures)
+        self.mean = np.zeros((0, n_measures))
+        self.var = np.zeros((0, n_measures))
+        self.season = np.ones((0, 12, n_measures))
+        self.count = np.zeros(0, dtype=np.int64)
+        self.last_seen = np.zeros(0, dtype='datetime64[ns]')
+        self.rows_seen = 0
+        self.last_batch = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _slots_for(self, df):
+        """State slot of every row, adding new locations
+
+        Rows are factorized once; only the distinct locations are looked up
+        against the known slots (slot numbers follow insertion order).
+        """
+        codes, uniques = pd.MultiIndex.from_arrays(
+            [df['state'].astype(str), df['district'].astype(str)]
+        ).factorize()
+        if self.slots:
+            unique_slots = pd.MultiIndex.from_tuples(list(self.slots)).get_indexer(uniques)
+        else:
+            unique_slots = np.full(len(uniques), -1, dtype=np.int64)
+        for i in np.flatnonzero(unique_slots < 0):
+            unique_slots[i] = self.slots[uniques[i]] = len(self.slots)
+        grow = len(self.slots) - len(self.count)
+        if grow:
+            n_measures = len(self.measures)
+            self.mean = np.vstack([self.mean, np.zeros((grow, n_measures))])
+            self.var = np.vstack([self.var, np.zeros((grow, n_measures))])
+            self.season = np.concatenate([self.season, np.ones((grow, 12, n_measures))])
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+            self.last_seen = np.concatenate([self.last_seen,
+                                             np.full(grow, np.datetime64('NaT'), dtype='datetime64[ns]')])
+        return unique_slots.astype(np.int64)[codes]
+
+    def _step(self, slots, months, values):
+        """Score one row per location against the running state, then fold it in"""
+        season = self.season[slots, months]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deseasoned = np.where(season > 0, values / season, values)
+        mean = self.mean[slots]
+        sd = np.sqrt(self.var[slots])
+        warm = (self.count[slots] >= self.warmup)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.where(warm & (sd > 0), (deseasoned - mean) / sd, 0.0)
+        z = np.nan_to_num(z, nan=0.0)
+
+        # Fold in, capping flagged values at the threshold
+        limit = self.threshold * sd
+        folded = np.where(warm & (sd > 0), np.clip(deseasoned, mean - limit, mean + limit), deseasoned)
+        missing = np.isnan(folded)
+        folded = np.where(missing, mean, folded)
+        first = (self.count[slots] == 0)[:, None]
+        diff = folded - mean
+        increment = np.where(first, diff, self.alpha * diff)
+        self.mean[slots] = mean + increment
+        self.var[slots] = np.where(first, 0.0, (1 - self.alpha) * (self.var[slots] + diff * increment))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(self.mean[slots] != 0, folded * season / self.mean[slots], 1.0)
+        warm_season = ~missing & np.isfinite(ratio) & ~first
+        self.season[slots, months] = np.where(
+            warm_season, (1 - self.season_beta) * season + self.season_beta * ratio, season
+        )
+        self.count[slots] += 1
+        return z
+
+    def update(self, df, date_column='date'):
+        """Score the rows of df newer than each location's last seen date, then learn from them
+
+        Rows are replayed in date order per location, one vectorized step
+        per position in the series, so each row costs O(1). Returns the
+        scored rows (state, district, date, anomaly_z, anomaly_score,
+        is_anomaly); rows already seen are skipped, so feeding a whole
+        reloaded frame only scores what is new. last_batch keeps the most
+        recent non-empty result.
+        """
+        measures = [m for m in self.measures if m in df.columns]
+        columns = [self.measures.index(m) for m in measures]
+        with self._lock:
+            slots = self._slots_for(df)
+            dates = pd.to_datetime(df[date_column]).to_numpy(dtype='datetime64[ns]')
+            last = self.last_seen[slots]
+            new = np.isnat(last) | (dates > last)
+
+            order = np.flatnonzero(new)
+            order = order[np.lexsort((dates[order], slots[order]))]
+            values = np.full((len(df), len(self.measures)), np.nan)
+            for j, measure in zip(columns, measures):
+                values[:, j] = df[measure].to_numpy(dtype='float64', na_value=np.nan)
+            months = pd.DatetimeIndex(dates).month.to_numpy() - 1
+
+            # Position of each new row within its location's new rows
+            new_slots = slots[order]
+            starts = np.flatnonzero(np.r_[True, new_slots[1:] != new_slots[:-1]])
+            position = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+
+            # Group the new rows by position once: a stable sort plus cumulative offsets
+            by_step = np.argsort(position, kind='stable')
+            step_groups = np.split(by_step, np.cumsum(np.bincount(position))[:-1]) if len(order) else []
+
+            z = np.zeros(len(order))
+            for group in step_groups:
+                rows = order[group]
+                step_z = self._step(slots[rows], months[rows], values[rows])
+                z[group] = np.take_along_axis(step_z, np.abs(step_z).argmax(axis=1)[:, None], axis=1)[:, 0]
+                self.last_seen[slots[rows]] = dates[rows]
+
+            self.rows_seen += len(order)
+            magnitude = np.abs(z)
+            scored = df.iloc[order][['state', 'district', date_column]].reset_index(drop=True)
+            scored['anomaly_z'] = z
+            scored['anomaly_score'] = magnitude / (magnitude + self.threshold)
+            scored['is_anomaly'] = (magnitude >= self.threshold).astype(np.int64)
+            if len(scored):
+                self.last_batch = scored
+            return scored
+
+    def stats(self):
+        with self._lock:
+            return {
+                'locations': len(self.slots),
+                'rows_seen': self.rows_seen,
+                'latest': pd.Timestamp(self.last_seen.max()) if len(self.last_seen) else None,
+                'state_kb': (self.mean.nbytes + self.var.nbytes + self.season.nbytes
+                             + self.count.nbytes + self.last_seen.nbytes) / 1024
+            }
+
+    def save(self, path=DEFAULT_STREAM_PATH):
+        """Snapshot the running state atomically"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_STREAM_PATH):
+        """Snapshot from disk, or a fresh scorer when there is none (or it is unreadable)"""
+        try:
+            scorer = joblib.load(path)
+        except (OSError, EOFError, ValueError, AttributeError):
+            return cls()
+        return scorer if isinstance(scorer, cls) else cls()
+
+
+# ========== ISOLATION FOREST ==========
+
+# Rows the forest is trained on (each tree still draws max_samples of them)
+ISOLATION_TRAIN_ROWS = 50_000
+
+# Rows scored per parallel batch
+ISOLATION_BATCH_ROWS = 100_000
+
+# Share of training rows the forest's flag threshold treats as anomalous
+ISOLATION_CONTAMINATION = 0.01
+
+
+def _report(progress, fraction, message):
+    """Forward progress to the caller's callback (which may raise to cancel)"""
+    if progress is not None:
+        progress(fraction, message)
+
+
+def _score_batch(forest, matrix, index, batch_rows):
+    """Isolation scores (0-1) of one row batch of the shared matrix"""
+    return index, -forest.score_samples(matrix.rows(index * batch_rows, (index + 1) * batch_rows))
+
+
+def isolation_forest_scores(df, n_estimators=200, contamination=ISOLATION_CONTAMINATION,
+                            train_rows=ISOLATION_TRAIN_ROWS, batch_rows=ISOLATION_BATCH_ROWS,
+                            n_jobs=-1, progress=None, matrix=None):
+    """Multivariate Isolation Forest over the clustering features of df
+
+    The forest is trained on a bounded random sample of the shared
+    standardized matrix, then every row is scored in batches spread over
+    threads (the trees are shared read-only). anomaly_score is the
+    forest's isolation score in 0-1 (above ~0.5 is unusual); is_anomaly
+    follows contamination. Raises ValueError when there is nothing to score.
+    """
+    features = select_features(df)
+    if not features:
+        raise ValueError("No numeric columns for anomaly detection")
+    if len(df) == 0:
+        raise ValueError("No rows to score")
+    if matrix is None:
+        matrix = build_feature_matrix(df, features)
+
+    _report(progress, 0.05, "Sampling training rows")
+    rng = np.random.default_rng(42)
+    sample = np.sort(rng.choice(matrix.n_rows, size=min(matrix.n_rows, train_rows), replace=False))
+
+    _report(progress, 0.1, f"Training {n_estimators} trees on {len(sample):,} rows")
+    start = time.perf_counter()
+    forest = IsolationForest(n_estimators=n_estimators, contamination=contamination, random_state=42)
+    forest.fit(matrix.X[sample])
+
+    n_batches = -(-matrix.n_rows // batch_rows)
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+    scores = np.empty(matrix.n_rows, dtype=np.float64)
+    done = 0
+    with threadpool_limits(limits=1):
+        batches = Parallel(n_jobs=min(n_jobs, n_batches), prefer='threads', return_as='generator_unordered')(
+            delayed(_score_batch)(forest, matrix, i, batch_rows) for i in range(n_batches)
+        )
+        for i, batch_scores in batches:
+            scores[i * batch_rows:i * batch_rows + len(batch_scores)] = batch_scores
+            done += 1
+            _report(progress, 0.2 + 0.8 * done / n_batches, f"Scored batch {done}/{n_batches}")
+
+    # score_samples is the negated paper score; offset_ is on the same scale
+    is_anomaly = (-scores < forest.offset_).astype(np.int64)
+    return {
+        'anomaly_score': scores,
+        'is_anomaly': is_anomaly,
+        'features': features,
+        'train_rows': len(sample),
+        'n_batches': n_batches,
+        'seconds': time.perf_counter() - start
+    }
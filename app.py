@@ -8,9 +8,25 @@ from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import os
 import glob
-from sklearn.cluster import KMeans, DBSCAN
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
+import time
+from ingestion import load_uidai_folders, load_uidai_incremental, build_standard_frame
+from data_store import SharedDatasetStore
+from data_cache import DataCache
+from olap_cube import OlapCube
+from clustering_engine import (cluster_frame, dbscan_frame, select_features, choose_engine,
+                               density_features, suggest_dbscan_eps, sweep_k, cluster_labels,
+                               profile_clusters, project_rows, stratified_sample,
+                               DEFAULT_MEMORY_BUDGET_MB)
+from clustering_store import ClusteringResultStore, feature_fingerprint, result_key
+from feature_matrix import build_feature_matrix
+from clustering_models import ClusteringModel, list_models
+from anomaly_engine import detect_anomalies, isolation_forest_scores, StreamingAnomalyScorer
+from job_runner import JobRunner, DONE as JOB_DONE, CANCELLED as JOB_CANCELLED
+from dtype_schema import optimize_frame, summarize_report
+from column_profile import profile_columns, profile_sketch, label_approximate, DESCRIBE_ROWS
+from quantile_sketch import sketch_frame, RANK_ERROR
+from geo_index import (GeoIndex, geo_signature, DEFAULT_GEO_DIR, DISTRICT_FILE, PINCODE_FILE,
+                       SOURCE_DISTRICT, SOURCE_UNPLACED, SOURCE_UNMATCHED)
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -38,6 +54,42 @@ PLOTLY_CONFIG = {
     'scrollZoom': True
 }
 
+# Sample dataset shape: (n_states, n_districts, n_months, seed)
+DEFAULT_SAMPLE_PARAMS = (10, 4, 12, 42)
+
+# Uploads at least this long default to sketch-based statistics
+SKETCH_MIN_ROWS = 5_000_000
+
+@st.cache_resource
+def get_dataset_store():
+    """One dataset store per server process, shared by every session"""
+    return SharedDatasetStore()
+
+@st.cache_resource
+def get_data_cache():
+    """One data cache per server process, shared by every session"""
+    return DataCache(max_entries=64, default_ttl=3600)
+
+@st.cache_resource
+def get_job_runner():
+    """One background job pool per server process for heavy analyses"""
+    return JobRunner(max_workers=2)
+
+@st.cache_resource
+def get_clustering_store():
+    """One clustering result store per server process, spilled to data/cache/clustering/"""
+    return ClusteringResultStore()
+
+@st.cache_resource
+def get_anomaly_scorer():
+    """One streaming anomaly scorer per server process, resumed from its data/models/streaming/ snapshot"""
+    return StreamingAnomalyScorer.load()
+
+@st.cache_resource
+def get_geo_index(signature):
+    """One coordinate index per set of gazetteer files under data/geo/"""
+    return GeoIndex.load()
+
 # ========== CSS STYLES ==========
 st.markdown("""
 <style>
@@ -390,128 +442,176 @@ st.markdown("""
 # ========== DASHBOARD CLASS ==========
 class UltimateAadhaarDashboard:
     def __init__(self):
-        # Initialize session state
+        self.dataset_store = get_dataset_store()
+        self.data_cache = get_data_cache()
+        self.clustering_store = get_clustering_store()
+        self.job_runner = get_job_runner()
+        self.anomaly_scorer = get_anomaly_scorer()
+        self.geo_index = get_geo_index(geo_signature())
+        
+        # Aggregation cache accounting for the current rerun
+        self.agg_hits = 0
+        self.agg_misses = 0
+        self.agg_time_saved = 0.0
+        
+        # Initialize session state (data itself lives in the shared cache)
         if 'mode' not in st.session_state:
             st.session_state.mode = "standard"
-        if 'data' not in st.session_state:
-            st.session_state.data = None
-        if 'risk_data' not in st.session_state:
-            st.session_state.risk_data = None
+        if 'sample_params' not in st.session_state:
+            st.session_state.sample_params = DEFAULT_SAMPLE_PARAMS
         if 'uploaded_data' not in st.session_state:
             st.session_state.uploaded_data = None
         if 'real_data_loaded' not in st.session_state:
             st.session_state.real_data_loaded = False
+        
+        # Real data lives in the process-wide store, so any session sees it
+        st.session_state.real_data_loaded = self.dataset_store.is_loaded()
         if 'clustering_results' not in st.session_state:
             st.session_state.clustering_results = None
-    
-    def load_real_uidai_data(self):
-        """Load real UIDAI datasets"""
+        if 'upload_schema_report' not in st.session_state:
+            st.session_state.upload_schema_report = None
+        if 'upload_key' not in st.session_state:
+            st.session_state.upload_key = None
+        if 'clustering_memory_mb' not in st.session_state:
+            st.session_state.clustering_memory_mb = DEFAULT_MEMORY_BUDGET_MB
+        if 'clustering_job' not in st.session_state:
+            st.session_state.clustering_job = None
+        if 'job_result_key' not in st.session_state:
+            st.session_state.job_result_key = 'clustering_results'
+        if 'k_sweep_results' not in st.session_state:
+            st.session_state.k_sweep_results = None
+        if 'job_notice' not in st.session_state:
+            st.session_state.job_notice = None
+        if 'isolation_results' not in st.session_state:
+            st.session_state.isolation_results = None
+    
+    def load_real_uidai_data(self, workers=1, incremental=False):
+        """Load real UIDAI datasets and publish them to the shared store
+        
+        In incremental mode only CSVs added since the last load are parsed
+        and folded into the published aggregates.
+        """
         try:
-            base_path = "data/raw/"
-            all_data = []
-            
-            # Load enrollment data
-            enrollment_files = glob.glob(f"{base_path}api_data_aadhar_enrolment/*.csv")
-            if enrollment_files:
-                enrollment_chunks = [pd.read_csv(f, low_memory=False) for f in enrollment_files[:2]]
-                if enrollment_chunks:
-                    enrollment_data = pd.concat(enrollment_chunks, ignore_index=True)
-                    all_data.append(("Enrollment", enrollment_data))
-            
-            # Load demographic data
-            demographic_files = glob.glob(f"{base_path}api_data_aadhar_demographic/*.csv")
-            if demographic_files:
-                demographic_chunks = [pd.read_csv(f, low_memory=False) for f in demographic_files[:2]]
-                if demographic_chunks:
-                    demographic_data = pd.concat(demographic_chunks, ignore_index=True)
-                    all_data.append(("Demographic", demographic_data))
-            
-            # Load biometric data
-            biometric_files = glob.glob(f"{base_path}api_data_aadhar_biometric/*.csv")
-            if biometric_files:
-                biometric_chunks = [pd.read_csv(f, low_memory=False) for f in biometric_files[:2]]
-                if biometric_chunks:
-                    biometric_data = pd.concat(biometric_chunks, ignore_index=True)
-                    all_data.append(("Biometric", biometric_data))
+            if incremental and self.dataset_store.is_loaded():
+                previous_sources = (self.dataset_store.stats or {}).get('sources')
+                previous_sketches = (self.dataset_store.stats or {}).get('sketches')
+                all_data, stats = load_uidai_incremental(dict(self.dataset_store.frames), previous_sources,
+                                                         "data/raw/", workers=workers,
+                                                         previous_sketches=previous_sketches)
+                if stats['mode'] == 'incremental' and stats['new_files'] == 0:
+                    st.info("ℹ️ No new UIDAI files since the last load")
+                    return []
+            else:
+                all_data, stats = load_uidai_folders("data/raw/", workers=workers)
             
+            if all_data:
+                standard = build_standard_frame(all_data)
+                if standard is None:
+                    st.warning("⚠️ No enrolment files found - dashboards keep using sample data")
+                else:
+                    # Shrink before publishing: categoricals, narrow ints, parsed dates
+                    all_data = [(name, optimize_frame(frame)[0]) for name, frame in all_data]
+                    standard, schema_report = optimize_frame(standard)
+                    stats['schema'] = summarize_report(schema_report)
+                    stats['schema_report'] = schema_report
+                    
+                    # Entries derived from the previous version can never be hit again
+                    previous_key = self.active_dataset_key()
+                    self.dataset_store.publish(all_data, standard, stats)
+                    if previous_key[0] == 'uidai':
+                        self.data_cache.invalidate(lambda key: previous_key in key)
+                    
+                    # Only district-months the streaming scorer has not seen are scored
+                    self.anomaly_scorer.update(standard)
+                    try:
+                        self.anomaly_scorer.save()
+                    except OSError as e:
+                        st.warning(f"⚠️ Could not snapshot streaming anomaly state: {str(e)}")
             return all_data
             
         except Exception as e:
             st.error(f"❌ Error loading UIDAI data: {str(e)}")
             return []
     
-    def create_sample_data(self):
-        """Create enhanced sample data with anomalies and clustering features"""
-        np.random.seed(42)
-        dates = pd.date_range('2023-01-01', '2023-12-01', freq='MS')
-        states = ['Maharashtra', 'Uttar Pradesh', 'Karnataka', 'Tamil Nadu', 
-                  'Delhi', 'Gujarat', 'Rajasthan', 'West Bengal', 'Bihar', 'Telangana']
-        districts = ['Urban', 'Rural', 'Semi-Urban', 'Metro']
-        
-        data = []
-        for date in dates:
-            for state in states:
-                for district in districts:
-                    base_pop = np.random.randint(10000, 50000)
-                    season_factor = 1 + 0.3 * np.sin(2 * np.pi * date.month / 12)
-                    state_factor = 1 + (states.index(state) * 0.15)
-                    
-                    enrolments = int(base_pop * season_factor * state_factor)
-                    successful_enrol = int(enrolments * np.random.uniform(0.88, 0.99))
-                    pending = enrolments - successful_enrol
-                    
-                    # Add demographic features for clustering
-                    avg_age = np.random.uniform(25, 45)
-                    gender_ratio = np.random.uniform(0.45, 0.55)
-                    digital_literacy = np.random.uniform(0.4, 0.9)
-                    
-                    # Add anomalies
-                    is_anomaly = 0
-                    anomaly_score = np.random.uniform(0, 0.2)
-                    
-                    # Create some interesting patterns for clustering
-                    if state in ['Maharashtra', 'Delhi', 'Karnataka']:
-                        digital_literacy += 0.15
-                        successful_enrol = int(successful_enrol * 1.1)
-                    
-                    if district == 'Rural':
-                        digital_literacy -= 0.1
-                        anomaly_score += 0.1
-                    
-                    if state == 'Maharashtra' and date.month == 3:
-                        enrolments = int(enrolments * 2.5)
-                        is_anomaly = 1
-                        anomaly_score = 0.95
-                    
-                    if state == 'Delhi' and date.month == 6:
-                        successful_enrol = int(successful_enrol * 0.65)
-                        is_anomaly = 1
-                        anomaly_score = 0.85
-                    
-                    data.append({
-                        'state': state,
-                        'district': district,
-                        'year_month': date.strftime('%Y-%m'),
-                        'date': date,
-                        'enrolments': enrolments,
-                        'successful_enrolments': successful_enrol,
-                        'pending_enrolments': pending,
-                        'success_rate': successful_enrol / max(enrolments, 1),
-                        'avg_age': avg_age,
-                        'gender_ratio': gender_ratio,
-                        'digital_literacy': digital_literacy,
-                        'population_density': np.random.uniform(0.1, 1.0),
-                        'is_anomaly': is_anomaly,
-                        'anomaly_score': anomaly_score,
-                        'month': date.month,
-                        'quarter': (date.month - 1) // 3 + 1
-                    })
-        
-        df = pd.DataFrame(data)
+    def create_sample_data(self, n_states=10, n_districts=4, n_months=12, seed=42):
+        """Create enhanced sample data with anomalies and clustering features
+        
+        Fully vectorized over the months × states × districts grid, so the
+        same generator produces the 480-row demo or multi-million-row load
+        test datasets. Two incidents are planted in the data (a Maharashtra
+        enrolment spike in March, a Delhi success-rate drop in June); the
+        anomaly flags themselves come from the anomaly engine.
+        """
+        np.random.seed(seed)
+        dates = pd.date_range('2023-01-01', periods=n_months, freq='MS')
+        base_states = ['Maharashtra', 'Uttar Pradesh', 'Karnataka', 'Tamil Nadu', 
+                       'Delhi', 'Gujarat', 'Rajasthan', 'West Bengal', 'Bihar', 'Telangana']
+        base_districts = ['Urban', 'Rural', 'Semi-Urban', 'Metro']
+        states = (base_states + [f'State {i + 1}' for i in range(len(base_states), n_states)])[:n_states]
+        districts = (base_districts + [f'District {i + 1}' for i in range(len(base_districts), n_districts)])[:n_districts]
+        
+        # Row order matches the original date -> state -> district loops
+        n_rows = n_months * n_states * n_districts
+        month_idx = np.repeat(np.arange(n_months), n_states * n_districts)
+        state_idx = np.tile(np.repeat(np.arange(n_states), n_districts), n_months)
+        district_idx = np.tile(np.arange(n_districts), n_months * n_states)
+        months = dates.month.values[month_idx]
+        
+        base_pop = np.random.randint(10000, 50000, n_rows)
+        season_factor = 1 + 0.3 * np.sin(2 * np.pi * months / 12)
+        state_factor = 1 + state_idx * 0.15
+        
+        enrolments = (base_pop * season_factor * state_factor).astype(np.int64)
+        successful_enrol = (enrolments * np.random.uniform(0.88, 0.99, n_rows)).astype(np.int64)
+        pending = enrolments - successful_enrol
+        
+        # Add demographic features for clustering
+        avg_age = np.random.uniform(25, 45, n_rows)
+        gender_ratio = np.random.uniform(0.45, 0.55, n_rows)
+        digital_literacy = np.random.uniform(0.4, 0.9, n_rows)
+        population_density = np.random.uniform(0.1, 1.0, n_rows)
+        
+        # Create some interesting patterns for clustering
+        state_names = np.array(states)
+        digital_states = np.isin(state_names, ['Maharashtra', 'Delhi', 'Karnataka'])[state_idx]
+        digital_literacy += 0.15 * digital_states
+        successful_enrol = np.where(digital_states, (successful_enrol * 1.1).astype(np.int64), successful_enrol)
+        
+        rural = (np.array(districts) == 'Rural')[district_idx]
+        digital_literacy -= 0.1 * rural
+        
+        maharashtra_spike = (state_names == 'Maharashtra')[state_idx] & (months == 3)
+        enrolments = np.where(maharashtra_spike, (enrolments * 2.5).astype(np.int64), enrolments)
+        
+        delhi_drop = (state_names == 'Delhi')[state_idx] & (months == 6)
+        successful_enrol = np.where(delhi_drop, (successful_enrol * 0.65).astype(np.int64), successful_enrol)
+        
+        df = pd.DataFrame({
+            'state': pd.Categorical.from_codes(state_idx, states),
+            'district': pd.Categorical.from_codes(district_idx, districts),
+            'year_month': pd.Categorical.from_codes(month_idx, dates.strftime('%Y-%m')),
+            'date': dates.values[month_idx],
+            'enrolments': enrolments,
+            'successful_enrolments': successful_enrol,
+            'pending_enrolments': pending,
+            'success_rate': successful_enrol / np.maximum(enrolments, 1),
+            'avg_age': avg_age,
+            'gender_ratio': gender_ratio,
+            'digital_literacy': digital_literacy,
+            'population_density': population_density,
+            'month': months,
+            'quarter': (months - 1) // 3 + 1
+        })
+        
+        # Seasonal robust z-scores per state/district decide what is anomalous
+        scores = detect_anomalies(df)
+        df.insert(df.columns.get_loc('month'), 'is_anomaly', scores['is_anomaly'])
+        df.insert(df.columns.get_loc('month'), 'anomaly_score', scores['anomaly_score'])
         return df
     
-    def create_risk_data(self):
+    def create_risk_data(self, seed=42):
         """Create enhanced risk assessment data"""
+        np.random.seed(seed)
         states = ['Maharashtra', 'Uttar Pradesh', 'Karnataka', 'Tamil Nadu', 
                   'Delhi', 'Gujarat', 'Rajasthan', 'West Bengal', 'Bihar', 'Telangana']
         
@@ -575,83 +675,333 @@ class UltimateAadhaarDashboard:
         
         return pd.DataFrame(risk_data)
     
-    def perform_clustering(self, df, n_clusters=3):
+    def kmeans_spec(self, df, n_clusters, memory_budget_mb):
+        """Features, engine and result-store params of a K-Means fit of df"""
+        features = select_features(df)
+        engine = choose_engine(len(df), len(features), memory_budget_mb)
+        params = {'n_clusters': n_clusters, 'engine': engine}
+        if engine == 'minibatch':
+            params['memory_budget_mb'] = memory_budget_mb
+        return features, engine, params
+    
+    def compute_clustering(self, df, n_clusters=3, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                           progress=None, dataset_key=None):
+        """KMeans results with cluster labels and statistics
+        
+        Makes no Streamlit calls, so it can run on a background job thread.
+        Frames above the engine's row threshold (or too big for the memory
+        budget) are fitted with chunked mini-batch K-Means. dataset_key names
+        the frame for the shared feature matrix. Raises ValueError when there
+        is nothing to cluster.
+        """
+        features, engine, params = self.kmeans_spec(df, n_clusters, memory_budget_mb)
+        
+        # Stored results hold the fitted model only; frame-level views are rebuilt
+        results = dict(self.stored_clustering(
+            df, features, 'kmeans', params,
+            lambda: cluster_frame(df, n_clusters, engine=engine,
+                                  memory_budget_mb=memory_budget_mb, progress=progress,
+                                  matrix=self.get_feature_matrix(df, features, dataset_key))
+        ))
+        return self.attach_cluster_views(df, results, n_clusters)
+    
+    def attach_cluster_views(self, df, results, n_clusters):
+        """Add categorical labels and the per-cluster profile to clustering results
+        
+        The labelled frame itself is only built on demand (clustered_frame).
+        """
+        results['cluster_labels'] = cluster_labels(results['clusters'], n_clusters)
+        results['cluster_stats'] = profile_clusters(df, results['clusters'], results['features'],
+                                                    results.get('center_distances'), n_clusters)
+        return results
+    
+    def clustered_frame(self, df, results, rows=None, dataset_key=None, with_projection=False):
+        """df (or its first rows) with cluster and cluster_label columns, for display and export
+        
+        with_projection adds PC1/PC2 for every row, projected chunk by chunk on demand.
+        """
+        labels = results['cluster_labels']
+        if rows is not None:
+            df, labels = df.iloc[:rows], labels[:rows]
+        columns = {'cluster': results['clusters'][:len(df)], 'cluster_label': labels}
+        if with_projection and ('model' in results or 'pca' in results):
+            coords = self.full_projection(df, results, dataset_key)
+            columns.update(PC1=coords[:, 0], PC2=coords[:, 1])
+        return df.assign(**columns)
+    
+    def full_projection(self, df, results, dataset_key=None):
+        """2-D projection of every row of df on the results' PCA axes"""
+        if 'model' in results:
+            return results['model'].project(df)
+        matrix = self.get_feature_matrix(df, results['features'], dataset_key)
+        return project_rows(matrix, results['pca'])
+    
+    def projection_sample(self, results):
+        """Plot frame for the per-cluster sample of projected points"""
+        pca_df = pd.DataFrame(results['pca_coords'], columns=['PC1', 'PC2'])
+        clusters = results['clusters']
+        if 'pca_index' in results:
+            clusters = clusters[results['pca_index']]
+        pca_df['Cluster'] = clusters.astype(str)
+        return pca_df
+    
+    def assign_with_model(self, df, model):
+        """Label df with a saved model's clusters (nearest saved center, no refit)"""
+        clusters, distances = model.assign(df)
+        results = {
+            'clusters': clusters,
+            'center_distances': distances,
+            'cluster_centers': model.centers,
+            'inertia': float((distances ** 2).sum()),
+            'features': model.features,
+            'cluster_sizes': pd.Series(clusters).value_counts().to_dict(),
+            'engine': 'saved',
+            'model_name': model.name,
+            'model': model
+        }
+        if model.pca_components is not None:
+            results['pca_index'] = stratified_sample(clusters)
+            results['pca_coords'] = model.project(df, results['pca_index'])
+        return self.attach_cluster_views(df, results, model.n_clusters)
+    
+    def perform_clustering(self, df, n_clusters=3, memory_budget_mb=None):
         """Perform KMeans clustering on the data"""
+        if memory_budget_mb is None:
+            memory_budget_mb = st.session_state.clustering_memory_mb
         try:
-            # Select numeric features for clustering
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-            
-            # Remove columns that might not be useful for clustering
-            exclude_cols = ['is_anomaly', 'anomaly_score', 'month', 'quarter']
-            numeric_cols = [col for col in numeric_cols if col not in exclude_cols]
-            
-            if len(numeric_cols) < 2:
-                st.warning("⚠️ Not enough numeric columns for clustering")
-                return None
-            
-            # Prepare data for clustering
-            X = df[numeric_cols].fillna(0).values
-            
-            # Standardize features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # Perform KMeans clustering
-            kmeans = KMeans(n_clusters=min(n_clusters, len(df)), 
-                           random_state=42, 
-                           n_init=10)
-            clusters = kmeans.fit_predict(X_scaled)
-            
-            # Perform PCA for visualization
-            pca = PCA(n_components=2)
-            X_pca = pca.fit_transform(X_scaled)
-            
-            # Create clustering results
-            results = {
-                'clusters': clusters,
-                'cluster_centers': kmeans.cluster_centers_,
-                'inertia': kmeans.inertia_,
-                'features': numeric_cols,
-                'pca_coords': X_pca,
-                'scaler': scaler,
-                'kmeans': kmeans,
-                'cluster_sizes': pd.Series(clusters).value_counts().to_dict()
-            }
-            
-            # Add cluster labels to original data
-            df_clustered = df.copy()
-            df_clustered['cluster'] = clusters
-            df_clustered['cluster_label'] = df_clustered['cluster'].apply(lambda x: f'Group {x+1}')
-            
-            # Calculate cluster statistics
-            cluster_stats = []
-            for cluster_id in range(n_clusters):
-                cluster_data = df_clustered[df_clustered['cluster'] == cluster_id]
-                if len(cluster_data) > 0:
-                    stats = {
-                        'cluster': cluster_id,
-                        'label': f'Group {cluster_id+1}',
-                        'size': len(cluster_data),
-                        'avg_enrolments': cluster_data['enrolments'].mean() if 'enrolments' in cluster_data.columns else 0,
-                        'avg_success_rate': cluster_data['success_rate'].mean() if 'success_rate' in cluster_data.columns else 0,
-                        'anomaly_rate': cluster_data['is_anomaly'].mean() if 'is_anomaly' in cluster_data.columns else 0
-                    }
-                    cluster_stats.append(stats)
-            
-            results['df_clustered'] = df_clustered
-            results['cluster_stats'] = pd.DataFrame(cluster_stats)
-            
-            return results
-            
+            return self.compute_clustering(df, n_clusters, memory_budget_mb,
+                                           dataset_key=self.frame_key())
+        except ValueError as e:
+            st.warning(f"⚠️ {str(e)}")
+            return None
         except Exception as e:
             st.error(f"❌ Clustering error: {str(e)}")
             return None
     
+    def compute_dbscan(self, df, eps=0.5, min_samples=5, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                       progress=None, dataset_key=None):
+        """DBSCAN results with labels and cluster profile (no Streamlit calls)"""
+        numeric_cols = density_features(df)
+        results = dict(self.stored_clustering(
+            df, numeric_cols, 'dbscan', {'eps': eps, 'min_samples': min_samples},
+            lambda: dbscan_frame(df, eps=eps, min_samples=min_samples,
+                                 memory_budget_mb=memory_budget_mb, progress=progress,
+                                 matrix=self.get_feature_matrix(df, numeric_cols, dataset_key))
+        ))
+        return self.attach_cluster_views(df, results, results['n_clusters'])
+    
     def load_data(self):
-        """Load or create data"""
-        if st.session_state.data is None:
-            st.session_state.data = self.create_sample_data()
-            st.session_state.risk_data = self.create_risk_data()
+        """Load or create sample and risk data through the shared data cache"""
+        params = st.session_state.sample_params
+        data = self.data_cache.get_or_compute(('sample',) + params,
+                                              lambda: self.create_sample_data(*params))
+        risk_data = self.data_cache.get_or_compute(('risk', params[-1]),
+                                                   lambda: self.create_risk_data(params[-1]))
+        return data, risk_data
+    
+    def get_active_data(self):
+        """Shared real UIDAI frame when loaded, otherwise the cached sample data"""
+        if self.dataset_store.is_loaded():
+            return self.dataset_store.standard
+        return self.load_data()[0]
+    
+    def active_dataset_key(self):
+        """Cache key identifying the dataset the dashboards are showing"""
+        if self.dataset_store.is_loaded():
+            return ('uidai', self.dataset_store.version)
+        return ('sample',) + st.session_state.sample_params
+    
+    def cached_aggregation(self, spec, compute):
+        """Memoize an aggregation of the active dataset on (dataset key, spec)
+        
+        Cached frames are shared by every session and must be treated as
+        read-only; copy before adding columns.
+        """
+        key = ('agg', self.active_dataset_key(), spec)
+        missing = object()
+        value = self.data_cache.get(key, missing)
+        if value is not missing:
+            self.agg_hits += 1
+            self.agg_time_saved += self.data_cache.compute_seconds(key)
+            return value
+        
+        self.agg_misses += 1
+        start = time.perf_counter()
+        value = compute()
+        self.data_cache.put(key, value, compute_seconds=time.perf_counter() - start)
+        return value
+    
+    def get_cube(self, df):
+        """OLAP cube over the active dataset, built once per dataset version"""
+        return self.cached_aggregation(('cube',), lambda: OlapCube(df))
+    
+    def get_state_quantiles(self, df, measure):
+        """Per-state box-plot statistics of one measure (whiskers clipped to 1.5 IQR)"""
+        def compute():
+            grouped = df.groupby('state', observed=True, sort=True)[measure]
+            boxes = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+            boxes.columns = ['q1', 'median', 'q3']
+            iqr = boxes['q3'] - boxes['q1']
+            boxes['lowerfence'] = np.maximum(grouped.min(), boxes['q1'] - 1.5 * iqr)
+            boxes['upperfence'] = np.minimum(grouped.max(), boxes['q3'] + 1.5 * iqr)
+            return boxes.reset_index()
+        return self.cached_aggregation(('state_quantiles', measure), compute)
+    
+    def get_anomaly_rows(self, df):
+        """Row-level anomalies of the active dataset (for the details table)"""
+        return self.cached_aggregation(('anomaly_rows',), lambda: df[df['is_anomaly'] == 1])
+    
+    def frame_key(self):
+        """Cache key for the frame the current mode analyses (None if unknown)"""
+        if st.session_state.mode == "standard":
+            return self.active_dataset_key()
+        if st.session_state.upload_key is None:
+            return None
+        return ('upload', st.session_state.upload_key)
+    
+    def get_feature_matrix(self, df, features, dataset_key=None):
+        """Shared standardized float32 matrix for (dataset, features), built once
+        
+        Every model reads views of it; the matrix is read-only.
+        """
+        if dataset_key is None:
+            return build_feature_matrix(df, features)
+        return self.data_cache.get_or_compute(('features', dataset_key, tuple(features)),
+                                              lambda: build_feature_matrix(df, features))
+    
+    def get_column_profile(self, df):
+        """Per-column statistics of every numeric column, computed once per frame"""
+        dataset_key = self.frame_key()
+        if dataset_key is None:
+            return profile_columns(df)
+        return self.data_cache.get_or_compute(('profile', dataset_key), lambda: profile_columns(df))
+    
+    def get_column_sketch(self, df):
+        """Mergeable quantile sketches of every numeric column, built in one streaming pass per frame"""
+        dataset_key = self.frame_key()
+        if dataset_key is None:
+            return sketch_frame(df)
+        return self.data_cache.get_or_compute(('sketch', dataset_key), lambda: sketch_frame(df))
+    
+    def stored_clustering(self, df, features, algorithm, params, compute=None):
+        """Fit through the persistent result store, keyed on the feature data's content
+        
+        Without compute the store is only consulted (None when never fitted).
+        """
+        key = result_key(feature_fingerprint(df, features), algorithm, params)
+        if compute is None:
+            return self.clustering_store.get(key)
+        return self.clustering_store.get_or_compute(key, compute)
+    
+    def compute_k_sweep(self, df, k_values, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, progress=None,
+                        dataset_key=None):
+        """Inertia / silhouette for every candidate k, through the persistent result store"""
+        k_values = list(k_values)
+        features = select_features(df)
+        params = {'k_values': k_values, 'memory_budget_mb': memory_budget_mb}
+        return self.stored_clustering(
+            df, features, 'kmeans_sweep', params,
+            lambda: sweep_k(df, k_values, memory_budget_mb, progress=progress,
+                            matrix=self.get_feature_matrix(df, features, dataset_key))
+        )
+    
+    def compute_isolation(self, df, progress=None, dataset_key=None):
+        """Isolation Forest scores for every row of df (no Streamlit calls)"""
+        features = select_features(df)
+        results = isolation_forest_scores(df, progress=progress,
+                                          matrix=self.get_feature_matrix(df, features, dataset_key))
+        results['dataset_key'] = dataset_key
+        return results
+    
+    def request_isolation(self, df, dataset_key):
+        """Isolation Forest results any session computed for dataset_key, else start a job"""
+        results = self.isolation_results(dataset_key)
+        if results is None:
+            self.submit_job(
+                "Isolation Forest scoring",
+                lambda job: self.data_cache.get_or_compute(
+                    ('isolation', dataset_key),
+                    lambda: self.compute_isolation(df, progress=job.update, dataset_key=dataset_key)
+                ) if dataset_key is not None else self.compute_isolation(df, progress=job.update),
+                result_key='isolation_results'
+            )
+        return results
+    
+    def apply_clustering_k(self, df, n_clusters):
+        """Cluster the active dataset with a chosen k (cached or as a background job)"""
+        results = self.request_clustering(df, n_clusters)
+        if results:
+            st.session_state.clustering_results = results
+            st.session_state.job_notice = ('success', f"✅ Found {n_clusters} distinct clusters!")
+    
+    def request_clustering(self, df, n_clusters):
+        """Cluster the active dataset
+        
+        Results any session already computed are returned at once (the
+        clustering store is their only cache); otherwise a background job is
+        started and None is returned.
+        """
+        memory_budget_mb = st.session_state.clustering_memory_mb
+        dataset_key = self.active_dataset_key()
+        features, _, params = self.kmeans_spec(df, n_clusters, memory_budget_mb)
+        stored = self.stored_clustering(df, features, 'kmeans', params)
+        if stored is not None:
+            return self.attach_cluster_views(df, dict(stored), n_clusters)
+        self.submit_job(
+            f"K-Means clustering (k={n_clusters})",
+            lambda job: self.compute_clustering(df, n_clusters, memory_budget_mb, progress=job.update,
+                                                dataset_key=dataset_key)
+        )
+        return None
+    
+    def submit_kmeans_job(self, df, n_clusters):
+        """Cluster an uploaded frame with K-Means on the background job runner"""
+        memory_budget_mb = st.session_state.clustering_memory_mb
+        dataset_key = self.frame_key()
+        return self.submit_job(
+            f"K-Means clustering (k={n_clusters})",
+            lambda job: self.compute_clustering(df, n_clusters, memory_budget_mb, progress=job.update,
+                                                dataset_key=dataset_key)
+        )
+    
+    def submit_job(self, label, fn, result_key='clustering_results'):
+        """Run fn(job) on the background job runner and track it in this session
+        
+        The finished job's result lands in st.session_state[result_key].
+        """
+        job = self.job_runner.submit(label, fn)
+        st.session_state.clustering_job = job.id
+        st.session_state.job_result_key = result_key
+        return job
+    
+    @st.fragment(run_every=1.0)
+    def show_job_status(self):
+        """Poll this session's background clustering job and collect its result"""
+        job = self.job_runner.get(st.session_state.clustering_job)
+        
+        if job is not None and not job.done():
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                status = "Cancelling…" if job.cancel_requested else job.message
+                st.progress(job.progress, text=f"⏳ {job.label} • {status} • {job.elapsed():.1f}s")
+            with col2:
+                if st.button("✖ Cancel", width='stretch', key="cancel_job",
+                             disabled=job.cancel_requested):
+                    job.cancel()
+            return
+        
+        # Finished (or forgotten): hand the outcome to a full rerun
+        st.session_state.clustering_job = None
+        if job is None:
+            st.session_state.job_notice = ('warning', "⚠️ Clustering job is no longer available")
+        elif job.status == JOB_DONE:
+            st.session_state[st.session_state.job_result_key] = job.result
+            st.session_state.job_notice = ('success', f"✅ {job.label} finished in {job.elapsed():.1f}s")
+        elif job.status == JOB_CANCELLED:
+            st.session_state.job_notice = ('info', f"✖ {job.label} cancelled")
+        else:
+            st.session_state.job_notice = ('error', f"❌ Clustering error: {job.error}")
+        st.rerun()
     
     # ========== HEADER & SIDEBAR ==========
     
@@ -736,14 +1086,33 @@ class UltimateAadhaarDashboard:
             # REAL UIDAI Data section
             st.markdown("### 🔐 UIDAI Real Data")
             
+            cpu_count = os.cpu_count() or 1
+            parser_workers = int(st.number_input("⚙️ Parser Processes", min_value=1, max_value=cpu_count,
+                                                 value=cpu_count, step=1,
+                                                 help="CSV files are parsed in parallel across this many processes"))
+            
             if st.button("🚀 Load Real UIDAI Data", width='stretch', type="primary"):
                 with st.spinner("Loading 5+ million real UIDAI records..."):
-                    real_data = self.load_real_uidai_data()
+                    real_data = self.load_real_uidai_data(workers=parser_workers)
                     if real_data:
-                        st.session_state.real_data_loaded = True
+                        st.session_state.real_data_loaded = self.dataset_store.is_loaded()
+                        st.session_state.clustering_results = None
+                        st.session_state.k_sweep_results = None
+                        st.session_state.isolation_results = None
                         st.success(f"✅ Loaded {len(real_data)} UIDAI datasets!")
                         st.rerun()
             
+            if st.session_state.real_data_loaded:
+                if st.button("➕ Append New Files", width='stretch', type="secondary",
+                             help="Parse only CSVs added since the last load and fold them in"):
+                    with st.spinner("Folding in new UIDAI files..."):
+                        real_data = self.load_real_uidai_data(workers=parser_workers, incremental=True)
+                        if real_data:
+                            st.session_state.clustering_results = None
+                            st.session_state.k_sweep_results = None
+                            st.session_state.isolation_results = None
+                            st.rerun()
+            
             if st.session_state.real_data_loaded:
                 st.markdown("""
                 <div style="background: linear-gradient(135deg, rgba(76, 175, 80, 0.2), rgba(129, 199, 132, 0.2)); 
@@ -758,13 +1127,42 @@ class UltimateAadhaarDashboard:
                 </div>
                 """, unsafe_allow_html=True)
             
+            if st.session_state.real_data_loaded and self.dataset_store.stats:
+                stats = self.dataset_store.stats
+                st.caption(
+                    f"🗄️ {len(self.dataset_store.standard):,} district records shared across sessions "
+                    f"({self.dataset_store.memory_mb():,.1f} MB, version {self.dataset_store.version})"
+                )
+                if 'schema' in stats and stats['schema']['factor']:
+                    st.caption(
+                        f"🧬 Schema pass saved {stats['schema']['bytes_saved'] / (1024 * 1024):,.1f} MB "
+                        f"({stats['schema']['factor']:.1f}× smaller)"
+                    )
+                peak = stats['peak_memory_mb']
+                peak_text = f"{peak:,.0f} MB" if peak is not None else "n/a"
+                st.caption(
+                    f"⚡ {stats['rows']:,} rows from {stats['files']} files "
+                    f"({stats['cache_hits']} from Parquet cache) • "
+                    f"{stats['rows_per_sec']:,.0f} rows/sec • peak memory {peak_text}"
+                )
+                if stats.get('mode') == 'incremental':
+                    st.caption(f"➕ Incremental load folded in {stats['new_files']} new files")
+                elif stats.get('reason'):
+                    st.caption(f"🔁 Full reload ({stats['reason']})")
+                if stats.get('estimated_speedup') is not None and stats['workers'] > 1:
+                    st.caption(
+                        f"🧵 {stats['workers']} parser processes • ~{stats['estimated_speedup']:.1f}× "
+                        f"estimated speedup (summed per-file parse time / parallel wall time; "
+                        f"no serial run is timed)"
+                    )
+            
             st.markdown("---")
             
             # Data statistics
             st.markdown("### 📈 Data Statistics")
             
-            if st.session_state.data is not None:
-                df = st.session_state.data
+            df = self.get_active_data()
+            if df is not None:
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -795,40 +1193,86 @@ class UltimateAadhaarDashboard:
             action_col1, action_col2 = st.columns(2)
             
             with action_col1:
-                if st.button("🔄 Refresh", width='stretch', type="primary"):
-                    st.session_state.data = self.create_sample_data()
-                    st.session_state.risk_data = self.create_risk_data()
+                if st.button("🔄 Refresh", width='stretch', type="primary",
+                             help="Regenerate the sample data with a fresh random seed"):
+                    sample_key = ('sample',) + st.session_state.sample_params
+                    self.data_cache.invalidate(
+                        lambda key: key == sample_key or key[0] == 'risk'
+                        or (key[0] in ('features', 'isolation', 'profile', 'sketch') and key[1] == sample_key)
+                    )
+                    # Same shape, new draw: a fixed seed would hand back identical data
+                    st.session_state.sample_params = (st.session_state.sample_params[:-1]
+                                                      + (int(np.random.default_rng().integers(2 ** 31)),))
                     st.session_state.clustering_results = None
+                    st.session_state.k_sweep_results = None
+                    st.session_state.isolation_results = None
                     st.success("✨ Data refreshed successfully!")
                     st.rerun()
             
             with action_col2:
                 if st.button("🎯 Sample", width='stretch', type="secondary"):
                     st.info("📥 Loading sample data...")
-                    self.load_data()
+                    st.session_state.sample_params = DEFAULT_SAMPLE_PARAMS
+                    st.session_state.clustering_results = None
+                    st.session_state.k_sweep_results = None
+                    st.session_state.isolation_results = None
+                    st.rerun()
+            
+            with st.expander("🧪 Synthetic Load Test"):
+                synth_col1, synth_col2 = st.columns(2)
+                with synth_col1:
+                    n_states = int(st.number_input("States", 1, 1000, 36, key="synth_states"))
+                    n_months = int(st.number_input("Months", 1, 600, 24, key="synth_months"))
+                with synth_col2:
+                    n_districts = int(st.number_input("Districts / State", 1, 10000, 200, key="synth_districts"))
+                    seed = int(st.number_input("Seed", 0, 2**31 - 1, 42, key="synth_seed"))
+                
+                st.caption(f"{n_states * n_districts * n_months:,} rows")
+                if st.button("⚙️ Generate", width='stretch', type="secondary", key="synth_generate"):
+                    st.session_state.sample_params = (n_states, n_districts, n_months, seed)
+                    st.session_state.clustering_results = None
+                    st.session_state.k_sweep_results = None
+                    st.session_state.isolation_results = None
                     st.rerun()
             
             # Clustering control
-            if st.session_state.data is not None:
+            if df is not None:
                 st.markdown("### 🤖 Clustering")
                 
                 n_clusters = st.slider("Number of Clusters", 2, 6, 3, 
                                       help="Adjust the number of clusters for analysis")
+                st.session_state.clustering_memory_mb = int(st.number_input(
+                    "Memory Budget (MB)", 32, 16384, st.session_state.clustering_memory_mb, step=32,
+                    help="Working memory per mini-batch chunk; the standardized float32 feature matrix is held in full on top of it"
+                ))
                 
-                if st.button("🔍 Perform Clustering", width='stretch', type="primary"):
-                    with st.spinner("🔬 Performing clustering analysis..."):
-                        clustering_results = self.perform_clustering(st.session_state.data, n_clusters)
-                        if clustering_results:
-                            st.session_state.clustering_results = clustering_results
-                            st.success(f"✅ Found {n_clusters} distinct clusters!")
-                            st.rerun()
+                if st.button("🔍 Perform Clustering", width='stretch', type="primary",
+                             disabled=bool(st.session_state.clustering_job)):
+                    self.apply_clustering_k(df, n_clusters)
+                    st.rerun()
+            
+            # Shared cache health
+            st.markdown("### 🧠 Data Cache")
+            cache_stats = self.data_cache.stats()
+            st.caption(
+                f"{cache_stats['hits']:,} hits • {cache_stats['misses']:,} misses "
+                f"({cache_stats['hit_rate'] * 100:.0f}% hit rate) • "
+                f"{cache_stats['entries']}/{cache_stats['max_entries']} entries • "
+                f"{cache_stats['evictions']} evicted"
+            )
+            store_stats = self.clustering_store.stats()
+            st.caption(
+                f"💾 Clustering store: {store_stats['memory_entries']} in memory • "
+                f"{store_stats['disk_entries']} on disk ({store_stats['disk_mb']:.1f} MB) • "
+                f"{store_stats['memory_hits'] + store_stats['disk_hits']:,} reused"
+            )
             
             # Export button
-            if st.session_state.data is not None:
-                csv = st.session_state.data.to_csv(index=False)
+            if df is not None:
+                # Serialized only when the button is clicked, not on every rerun
                 st.download_button(
                     label="📥 Export CSV",
-                    data=csv,
+                    data=lambda: df.to_csv(index=False),
                     file_name="aadhaar_analytics_pro.csv",
                     mime="text/csv",
                     width='stretch',
@@ -963,6 +1407,13 @@ class UltimateAadhaarDashboard:
         
         col_info_df = pd.DataFrame(col_info)
         st.dataframe(col_info_df)
+        
+        # Memory saved by the ingestion-time schema pass
+        schema_report = st.session_state.upload_schema_report
+        if schema_report is not None:
+            summary = summarize_report(schema_report)
+            with st.expander(f"🧬 Schema Optimization • {summary['bytes_saved'] / (1024 * 1024):,.1f} MB saved"):
+                st.dataframe(schema_report[schema_report['bytes_saved'] != 0])
     
     def show_visualizations(self, df):
         """Show visualizations for uploaded data"""
@@ -1044,18 +1495,37 @@ class UltimateAadhaarDashboard:
         """Show detailed statistics"""
         st.markdown("### 📊 **Statistical Analysis**")
         
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        approximate = st.radio(
+            "Statistics mode", ["Exact", "Sketch (approximate)"],
+            index=int(len(df) >= SKETCH_MIN_ROWS), horizontal=True, key="stats_mode",
+            help="Sketches summarize each column in one streaming pass with bounded memory "
+                 "instead of sorting it"
+        ) != "Exact"
+        
+        if approximate:
+            sketch = self.get_column_sketch(df)
+            profile = profile_sketch(sketch)
+            st.caption(
+                f"📏 ≈ Quartiles, IQR bounds and outlier counts within ±{RANK_ERROR * 100:.1f}% in rank "
+                f"(on columns with few distinct values a quartile may land on a neighbouring value) • "
+                f"count, mean, std, min, max and moments exact • "
+                f"{sketch.nbytes() / 1024:,.0f} KB of sketches for {sketch.rows:,} rows"
+            )
+        else:
+            profile = self.get_column_profile(df)
+        numeric_cols = profile.index.tolist()
         
         if numeric_cols:
             # Descriptive statistics
             st.markdown("#### 📋 **Descriptive Statistics**")
-            st.dataframe(df[numeric_cols].describe().round(2))
+            describe = profile[DESCRIBE_ROWS]
+            st.dataframe((label_approximate(describe) if approximate else describe).T.round(2))
             
             # Skewness and kurtosis
             skew_kurt = pd.DataFrame({
                 'Column': numeric_cols,
-                'Skewness': [df[col].skew() for col in numeric_cols],
-                'Kurtosis': [df[col].kurtosis() for col in numeric_cols]
+                'Skewness': profile['skewness'].to_numpy(),
+                'Kurtosis': profile['kurtosis'].to_numpy()
             }).round(3)
             
             st.markdown("#### 📈 **Distribution Metrics**")
@@ -1066,26 +1536,27 @@ class UltimateAadhaarDashboard:
             
             outlier_col = st.selectbox("Select column for outlier analysis", numeric_cols, key="outlier_col")
             
-            Q1 = df[outlier_col].quantile(0.25)
-            Q3 = df[outlier_col].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers = df[(df[outlier_col] < lower_bound) | (df[outlier_col] > upper_bound)]
+            column_stats = profile.loc[outlier_col]
+            lower_bound = column_stats['lower_bound']
+            upper_bound = column_stats['upper_bound']
             
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Outliers Found", len(outliers))
+                st.metric("Outliers Found", f"{'~' if approximate else ''}{int(column_stats['outliers']):,}")
             with col2:
                 st.metric("Lower Bound", f"{lower_bound:.2f}")
             with col3:
                 st.metric("Upper Bound", f"{upper_bound:.2f}")
             
-            if len(outliers) > 0:
+            if column_stats['outliers'] > 0:
                 with st.expander("View Outliers"):
-                    st.dataframe(outliers.head(20))
+                    values = df[outlier_col]
+                    st.dataframe(df[(values < lower_bound) | (values > upper_bound)].head(20))
+            
+            with st.expander("📋 Outliers in All Columns"):
+                overview = profile[['lower_bound', 'upper_bound', 'outliers', 'outlier_pct']].copy()
+                overview['outlier_pct'] = overview['outlier_pct'] * 100
+                st.dataframe(overview.sort_values('outliers', ascending=False).round(2))
     
     def show_clustering_analysis(self, df):
         """Show clustering analysis for uploaded data"""
@@ -1106,36 +1577,24 @@ class UltimateAadhaarDashboard:
         with col2:
             algorithm = st.selectbox("Clustering algorithm", ["K-Means", "DBSCAN"], key="algo_select")
         
-        if st.button("🚀 Perform Clustering", type="primary", width='stretch', key="upload_cluster_btn"):
-            with st.spinner("🔬 Running clustering algorithm..."):
-                if algorithm == "K-Means":
-                    results = self.perform_clustering(df, n_clusters)
-                else:
-                    # DBSCAN clustering
-                    X = df[numeric_cols].fillna(0).values
-                    
-                    # Standardize
-                    scaler = StandardScaler()
-                    X_scaled = scaler.fit_transform(X)
-                    
-                    # DBSCAN
-                    dbscan = DBSCAN(eps=0.5, min_samples=5)
-                    clusters = dbscan.fit_predict(X_scaled)
-                    
-                    results = {
-                        'clusters': clusters,
-                        'df_clustered': df.copy(),
-                        'n_clusters': len(set(clusters)) - (1 if -1 in clusters else 0),
-                        'noise_points': sum(clusters == -1)
-                    }
-                    results['df_clustered']['cluster'] = clusters
-                    results['df_clustered']['cluster_label'] = results['df_clustered']['cluster'].apply(
-                        lambda x: f'Group {x+1}' if x != -1 else 'Noise'
-                    )
-                
-                if results:
-                    st.session_state.clustering_results = results
-                    st.success(f"✅ Found {results.get('n_clusters', n_clusters)} clusters!")
+        if algorithm == "DBSCAN":
+            eps, min_samples = self.show_dbscan_parameters(df)
+        else:
+            self.show_k_sweep(df, "upload", lambda k: self.submit_kmeans_job(df, k))
+        
+        if st.button("🚀 Perform Clustering", type="primary", width='stretch', key="upload_cluster_btn",
+                     disabled=bool(st.session_state.clustering_job)):
+            if algorithm == "K-Means":
+                self.submit_kmeans_job(df, n_clusters)
+            else:
+                memory_budget_mb = st.session_state.clustering_memory_mb
+                dataset_key = self.frame_key()
+                self.submit_job(
+                    f"DBSCAN clustering (eps={eps:g}, min_samples={min_samples})",
+                    lambda job: self.compute_dbscan(df, eps, min_samples, memory_budget_mb,
+                                                    progress=job.update, dataset_key=dataset_key)
+                )
+            st.rerun()
         
         # Show clustering results if available
         if st.session_state.clustering_results:
@@ -1143,6 +1602,16 @@ class UltimateAadhaarDashboard:
             
             st.markdown("#### 📊 **Clustering Results**")
             
+            if 'noise_points' in results:
+                st.caption(
+                    f"{results['n_clusters']} clusters • {results['noise_points']:,} noise points • "
+                    f"{results.get('core_points', 0):,} core points • "
+                    f"{results.get('n_components', 0)} PCA components "
+                    f"({results.get('explained_variance', 0) * 100:.0f}% of variance)"
+                )
+            elif results.get('engine') == 'saved':
+                st.caption(f"📦 Assigned with saved model '{results['model_name']}' (no refit)")
+            
             # Cluster distribution
             cluster_dist = pd.Series(results['clusters']).value_counts().sort_index()
             
@@ -1155,9 +1624,7 @@ class UltimateAadhaarDashboard:
             
             # PCA visualization if available
             if 'pca_coords' in results:
-                pca_df = pd.DataFrame(results['pca_coords'], columns=['PC1', 'PC2'])
-                pca_df['Cluster'] = results['clusters']
-                pca_df['Cluster'] = pca_df['Cluster'].astype(str)
+                pca_df = self.projection_sample(results)
                 
                 fig = px.scatter(pca_df, x='PC1', y='PC2', color='Cluster',
                                 title="PCA Visualization of Clusters",
@@ -1167,12 +1634,163 @@ class UltimateAadhaarDashboard:
             
             # Show clustered data
             with st.expander("📋 View Clustered Data"):
-                st.dataframe(results.get('df_clustered', df).head(20))
+                st.dataframe(self.clustered_frame(df, results, rows=20))
             
             # Cluster statistics
             if 'cluster_stats' in results:
                 st.markdown("#### 📈 **Cluster Statistics**")
                 st.dataframe(results['cluster_stats'])
+        
+        self.show_saved_models(df, "upload")
+    
+    def show_saved_models(self, df, key):
+        """Save the current K-Means fit as a model, or label this frame with a saved one"""
+        results = st.session_state.clustering_results
+        
+        with st.expander("📦 Saved Clustering Models"):
+            if results and 'scaler' in results:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    name = st.text_input("Model name", f"kmeans-k{len(results['cluster_centers'])}",
+                                         key=f"{key}_model_name")
+                with col2:
+                    st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                    if st.button("💾 Save Model", width='stretch', key=f"{key}_save_model"):
+                        try:
+                            ClusteringModel.from_results(name, results).save()
+                            st.success(f"✅ Saved model '{name}'")
+                        except (ValueError, OSError) as e:
+                            st.error(f"❌ Could not save model: {str(e)}")
+            else:
+                st.caption("Run K-Means clustering to save its centers as a reusable model")
+            
+            models = [model for model in list_models() if not model.missing_features(df)]
+            if not models:
+                st.caption("No saved model matches this data's columns")
+                return
+            
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                names = [model.name for model in models]
+                choice = st.selectbox("Saved model", names, key=f"{key}_model_choice",
+                                      format_func=lambda n: f"{n} (k={models[names.index(n)].n_clusters})")
+            with col2:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button("🏷️ Assign Clusters", width='stretch', key=f"{key}_assign_model",
+                             disabled=bool(st.session_state.clustering_job)):
+                    model = models[names.index(choice)]
+                    try:
+                        st.session_state.clustering_results = self.assign_with_model(df, model)
+                        st.session_state.job_notice = (
+                            'success', f"✅ Assigned {len(df):,} rows to {model.n_clusters} saved clusters"
+                        )
+                    except ValueError as e:
+                        st.session_state.job_notice = ('warning', f"⚠️ {str(e)}")
+                    st.rerun()
+    
+    def show_k_sweep(self, df, key, apply_k):
+        """Elbow / silhouette sweep over k with a recommended cluster count
+        
+        apply_k(k) is called when the user clusters with the recommendation.
+        """
+        sweep = st.session_state.k_sweep_results
+        
+        with st.expander("📈 Find the Best Number of Clusters", expanded=sweep is not None):
+            col1, col2 = st.columns([3, 1])
+            
+            with col1:
+                k_min, k_max = st.slider("Candidate k range", 2, 15, (2, 10), key=f"{key}_k_range")
+            
+            with col2:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button("📈 Run k Sweep", width='stretch', key=f"{key}_k_sweep",
+                             disabled=bool(st.session_state.clustering_job)):
+                    memory_budget_mb = st.session_state.clustering_memory_mb
+                    dataset_key = self.frame_key()
+                    self.submit_job(
+                        f"k sweep (k={k_min}–{k_max})",
+                        lambda job: self.compute_k_sweep(df, range(k_min, k_max + 1), memory_budget_mb,
+                                                         progress=job.update, dataset_key=dataset_key),
+                        result_key='k_sweep_results'
+                    )
+                    st.rerun()
+            
+            if sweep is None:
+                st.caption("Fits every candidate k (mini-batch fits in parallel threads) and scores each "
+                           "with inertia and silhouette")
+                return
+            
+            table = sweep['table']
+            best_k = sweep['recommended_k']
+            
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.add_trace(go.Scatter(x=table['k'], y=table['inertia'], name='Inertia (elbow)',
+                                     mode='lines+markers', line=dict(color='#667eea', width=3)),
+                          secondary_y=False)
+            fig.add_trace(go.Scatter(x=table['k'], y=table['silhouette'], name='Silhouette',
+                                     mode='lines+markers', line=dict(color='#ff6b6b', width=3)),
+                          secondary_y=True)
+            fig.add_vline(x=best_k, line_dash="dash", line_color="green",
+                          annotation_text=f"Recommended k = {best_k}")
+            fig.update_layout(title="Elbow & Silhouette by Number of Clusters",
+                              template='plotly_white', height=400)
+            fig.update_xaxes(title_text="Number of clusters (k)", dtick=1)
+            fig.update_yaxes(title_text="Inertia", secondary_y=False)
+            fig.update_yaxes(title_text="Silhouette", secondary_y=True)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            
+            sampled = " (sample)" if sweep['engine'] == 'minibatch' else ""
+            st.caption(
+                f"🏆 Recommended k = {best_k} (best silhouette) • {len(table)} fits on "
+                f"{sweep['rows_used']:,} rows{sampled} in {sweep['wall_seconds']:.1f}s wall "
+                f"({sweep['serial_seconds']:.1f}s of fitting)"
+            )
+            
+            if st.button(f"✅ Cluster with k = {best_k}", width='stretch', type="primary",
+                         key=f"{key}_apply_k", disabled=bool(st.session_state.clustering_job)):
+                apply_k(best_k)
+                st.rerun()
+    
+    def show_dbscan_parameters(self, df):
+        """eps / min_samples inputs with a k-distance eps suggestion"""
+        if 'dbscan_eps' not in st.session_state:
+            st.session_state.dbscan_eps = 0.5
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col2:
+            min_samples = int(st.number_input("Min samples", 2, 1000, 5, key="dbscan_min_samples"))
+        
+        with col3:
+            st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+            if st.button("📐 Suggest eps", width='stretch', key="dbscan_suggest"):
+                with st.spinner("📐 Computing k-distances on a sample..."):
+                    try:
+                        features = density_features(df)
+                        eps, k_distances = suggest_dbscan_eps(
+                            df, min_samples, st.session_state.clustering_memory_mb,
+                            matrix=self.get_feature_matrix(df, features, self.frame_key())
+                        )
+                        st.session_state.dbscan_eps = round(eps, 4)
+                        st.session_state.dbscan_k_distances = (min_samples, k_distances)
+                    except ValueError as e:
+                        st.warning(f"⚠️ {str(e)}")
+        
+        with col1:
+            eps = float(st.number_input("eps (PCA space)", 0.0001, 100.0, step=0.05,
+                                        format="%.4f", key="dbscan_eps"))
+        
+        suggestion = st.session_state.get('dbscan_k_distances')
+        if suggestion is not None:
+            k, k_distances = suggestion
+            fig = px.line(x=np.arange(len(k_distances)), y=k_distances,
+                          title=f"Sorted {k}-distance curve (sampled rows)",
+                          labels={'x': 'Sampled points (sorted)', 'y': f'Distance to {k}th neighbor'})
+            fig.add_hline(y=eps, line_dash="dash", line_color="red", annotation_text=f"eps = {eps:g}")
+            fig.update_layout(template='plotly_white', height=300)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        
+        return eps, min_samples
     
     def show_export_options(self, df):
         """Show export options for analyzed data"""
@@ -1194,29 +1812,63 @@ class UltimateAadhaarDashboard:
                 key="export_original"
             )
         
+        dataset_key = self.frame_key()
+        isolation = self.isolation_results(dataset_key)
+        
         # Export with clustering if available
-        if st.session_state.clustering_results and 'df_clustered' in st.session_state.clustering_results:
-            clustered_df = st.session_state.clustering_results['df_clustered']
-            csv_clustered = clustered_df.to_csv(index=False)
-            
+        results = st.session_state.clustering_results
+        if results and 'cluster_labels' in results:
             with col2:
                 st.download_button(
                     label="📥 Download Clustered Data",
-                    data=csv_clustered,
+                    data=lambda: self.with_isolation_scores(
+                        self.clustered_frame(df, results, dataset_key=dataset_key, with_projection=True),
+                        isolation
+                    ).to_csv(index=False),
                     file_name="clustered_data.csv",
                     mime="text/csv",
                     width='stretch',
                     type="primary",
                     key="export_clustered"
                 )
+        
+        # Per-row multivariate anomaly scores
+        st.markdown("#### 🌲 **Anomaly Scores**")
+        if isolation is None:
+            st.caption("Isolation Forest over the numeric columns adds an isolation_score column "
+                       "(0-1, higher is more unusual) to the exports")
+            if st.button("🌲 Score Rows with Isolation Forest", width='stretch', key="upload_isolation",
+                         disabled=bool(st.session_state.clustering_job)):
+                self.request_isolation(df, dataset_key)
+                st.rerun()
+        else:
+            st.caption(f"{int(isolation['is_anomaly'].sum()):,} of {len(df):,} rows flagged • trained on "
+                       f"{isolation['train_rows']:,} rows • scored in {isolation['n_batches']} batches")
+            st.download_button(
+                label="📥 Download with Anomaly Scores",
+                data=lambda: self.with_isolation_scores(df, isolation).to_csv(index=False),
+                file_name="anomaly_scored_data.csv",
+                mime="text/csv",
+                width='stretch',
+                type="primary",
+                key="export_isolation"
+            )
+    
+    def with_isolation_scores(self, frame, isolation):
+        """frame plus isolation_score / isolation_anomaly columns (unchanged without results)"""
+        if isolation is None:
+            return frame
+        n_rows = len(frame)
+        return frame.assign(isolation_score=isolation['anomaly_score'][:n_rows],
+                            isolation_anomaly=isolation['is_anomaly'][:n_rows])
     
     # ========== STANDARD MODE FUNCTIONS ==========
     
     def run_standard_mode(self):
         """Run standard analysis mode with enhanced features"""
-        self.load_data()
-        df = st.session_state.data
-        risk_df = st.session_state.risk_data
+        df = self.get_active_data()
+        risk_df = self.load_data()[1]
+        kpis = self.get_cube(df).kpis()
         
         # Enhanced KPI Cards
         st.markdown("### 🎯 **Key Performance Indicators**")
@@ -1224,7 +1876,7 @@ class UltimateAadhaarDashboard:
         kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
         
         with kpi_col1:
-            total_enrol = df['enrolments'].sum() / 1_000_000
+            total_enrol = kpis['enrolments'] / 1_000_000
             st.markdown(f"""
             <div class="metric-card">
                 <div style="font-size: 3rem; margin-bottom: 0.8rem;">👥</div>
@@ -1238,7 +1890,7 @@ class UltimateAadhaarDashboard:
             """, unsafe_allow_html=True)
         
         with kpi_col2:
-            total_success = df['successful_enrolments'].sum() / 1_000_000
+            total_success = kpis['successful_enrolments'] / 1_000_000
             st.markdown(f"""
             <div class="metric-card">
                 <div style="font-size: 3rem; margin-bottom: 0.8rem;">✅</div>
@@ -1252,7 +1904,7 @@ class UltimateAadhaarDashboard:
             """, unsafe_allow_html=True)
         
         with kpi_col3:
-            success_rate = (df['successful_enrolments'].sum() / df['enrolments'].sum()) * 100
+            success_rate = kpis['success_rate'] * 100
             st.markdown(f"""
             <div class="metric-card">
                 <div style="font-size: 3rem; margin-bottom: 0.8rem;">🎯</div>
@@ -1266,7 +1918,7 @@ class UltimateAadhaarDashboard:
             """, unsafe_allow_html=True)
         
         with kpi_col4:
-            anomalies = df['is_anomaly'].sum()
+            anomalies = kpis['anomalies']
             st.markdown(f"""
             <div class="metric-card">
                 <div style="font-size: 3rem; margin-bottom: 0.8rem;">⚠️</div>
@@ -1309,11 +1961,12 @@ class UltimateAadhaarDashboard:
     
     def show_enhanced_dashboard(self, df):
         """Show enhanced dashboard with interactive charts"""
+        cube = self.get_cube(df)
         col1, col2 = st.columns(2)
         
         with col1:
             # Time series with area chart
-            monthly = df.groupby('date')[['enrolments', 'successful_enrolments']].sum().reset_index()
+            monthly = cube.rollup('date', {'enrolments': 'sum', 'successful_enrolments': 'sum'})
             fig = px.area(monthly, x='date', y=['enrolments', 'successful_enrolments'],
                          title="📈 Monthly Enrolment Trends",
                          color_discrete_map={'enrolments': '#667eea', 'successful_enrolments': '#00b09b'},
@@ -1328,7 +1981,7 @@ class UltimateAadhaarDashboard:
         
         with col2:
             # Success rate gauge
-            success_rate = (df['successful_enrolments'].sum() / df['enrolments'].sum()) * 100
+            success_rate = cube.kpis()['success_rate'] * 100
             
             fig = go.Figure(go.Indicator(
                 mode="gauge+number+delta",
@@ -1368,10 +2021,10 @@ class UltimateAadhaarDashboard:
         
         with col3:
             # State performance
-            state_performance = df.groupby('state').agg({
+            state_performance = cube.rollup('state', {
                 'enrolments': 'sum',
                 'success_rate': 'mean'
-            }).reset_index()
+            })
             state_performance = state_performance.sort_values('enrolments', ascending=False).head(10)
             
             fig = px.bar(state_performance, x='enrolments', y='state', orientation='h',
@@ -1385,10 +2038,10 @@ class UltimateAadhaarDashboard:
         
         with col4:
             # District performance
-            district_performance = df.groupby('district').agg({
+            district_performance = cube.rollup('district', {
                 'success_rate': 'mean',
                 'digital_literacy': 'mean'
-            }).reset_index()
+            })
             
             fig = px.scatter(district_performance, x='digital_literacy', y='success_rate',
                             size=[20]*len(district_performance),
@@ -1399,83 +2052,132 @@ class UltimateAadhaarDashboard:
                             template='plotly_white')
             fig.update_traces(marker=dict(line=dict(width=2, color='DarkSlateGrey')))
             st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+        
+        self.show_raw_distribution()
+    
+    def show_raw_distribution(self):
+        """Per-record distribution of the raw UIDAI counts, from the ingestion sketches"""
+        sketches = (self.dataset_store.stats or {}).get('sketches') if self.dataset_store.is_loaded() else None
+        if not sketches:
+            return
+        
+        with st.expander("📏 Raw Record Distribution"):
+            folder = st.selectbox("Dataset", list(sketches), key="raw_distribution_folder")
+            sketch = sketches[folder]
+            st.caption(
+                f"Summarized while ingesting {sketch.rows:,} CSV records • ≈ quartiles and outlier "
+                f"counts within ±{RANK_ERROR * 100:.1f}% in rank, so on few-valued counts a quartile "
+                f"may land on a neighbouring value • {sketch.nbytes() / 1024:,.0f} KB"
+            )
+            profile = profile_sketch(sketch)
+            st.dataframe(label_approximate(profile[DESCRIBE_ROWS + ['upper_bound', 'outliers', 'outlier_pct']])
+                         .round(2))
     
     def show_geographic_view(self, df):
         """Show geographic visualization"""
         st.markdown("### 🌍 **Geographic Analysis**")
         
-        geo_data = df.groupby('state').agg({
-            'enrolments': 'sum',
-            'success_rate': 'mean',
-            'digital_literacy': 'mean'
-        }).reset_index()
-        
-        # Create mock coordinates for Indian states
-        state_coords = {
-            'Maharashtra': [19.7515, 75.7139],
-            'Uttar Pradesh': [26.8467, 80.9462],
-            'Karnataka': [15.3173, 75.7139],
-            'Tamil Nadu': [11.1271, 78.6569],
-            'Delhi': [28.7041, 77.1025],
-            'Gujarat': [22.2587, 71.1924],
-            'Rajasthan': [27.0238, 74.2179],
-            'West Bengal': [22.9868, 87.8550],
-            'Bihar': [25.0961, 85.3131],
-            'Telangana': [18.1124, 79.0193]
-        }
-        
-        geo_data['lat'] = geo_data['state'].map(lambda x: state_coords.get(x, [20.5937])[0])
-        geo_data['lon'] = geo_data['state'].map(lambda x: state_coords.get(x, [20.5937, 78.9629])[1])
-        geo_data['size'] = geo_data['enrolments'] / geo_data['enrolments'].max() * 100
-        
-        # Create geographic scatter plot
-        fig = px.scatter_geo(geo_data,
-                            lat='lat',
-                            lon='lon',
-                            size='size',
-                            color='success_rate',
-                            hover_name='state',
-                            hover_data=['enrolments', 'success_rate', 'digital_literacy'],
-                            title='Geographic Distribution of Aadhaar Performance',
-                            color_continuous_scale='Viridis',
-                            projection='natural earth',
-                            template='plotly_white')
-        
-        fig.update_geos(
-            showland=True,
-            landcolor="lightgray",
-            showcountries=True,
-            showcoastlines=True,
-            countrycolor="white",
-            coastlinecolor="white"
-        )
-        
-        fig.update_layout(
-            geo=dict(
-                bgcolor='rgba(255,255,255,0.1)',
-                lakecolor='rgba(255,255,255,0.1)'
+        cube = self.get_cube(df)
+        level = st.radio("Map level", ["State", "District"], horizontal=True, key="geo_level").lower()
+        dimension = 'state' if level == 'state' else ('state', 'district')
+        
+        # Coordinates are joined onto the roll-up (one row per state / district), never per record
+        geo_data = self.cached_aggregation(('geo', level, geo_signature()), lambda: self.geo_index.attach(
+            cube.rollup(dimension, {'enrolments': 'sum', 'success_rate': 'mean', 'digital_literacy': 'mean'}),
+            level
+        ))
+        
+        sources = geo_data['geo_source'].value_counts()
+        unmatched = geo_data.loc[geo_data['geo_source'] == SOURCE_UNMATCHED, 'state'].astype(str).unique()
+        if level == 'district':
+            st.caption(
+                f"🗺️ {sources.get(SOURCE_DISTRICT, 0):,} districts placed from the gazetteer • "
+                f"{sources.get(SOURCE_UNPLACED, 0):,} unplaced (no gazetteer entry)"
             )
-        )
-        
-        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            unplaced = geo_data[geo_data['geo_source'] == SOURCE_UNPLACED]
+            if len(unplaced):
+                with st.expander(f"📍 Unplaced districts ({len(unplaced):,})"):
+                    st.dataframe(unplaced[['state_name', 'district', 'enrolments', 'success_rate']]
+                                 .sort_values('enrolments', ascending=False), hide_index=True)
+        if len(unmatched):
+            st.warning(f"⚠️ Not on the map (unknown state / UT): {', '.join(sorted(unmatched))}")
+        
+        # Only rows with real coordinates are drawn
+        geo_data = geo_data[geo_data['lat'].notna()].copy()
+        if level == 'district' and not self.geo_index.n_districts:
+            st.warning(
+                f"🗺️ No district gazetteer is installed, so districts cannot be mapped. Only state "
+                f"centroids ship with the dashboard; add {DEFAULT_GEO_DIR}/{DISTRICT_FILE} "
+                f"(state, district, lat, lon) or {DEFAULT_GEO_DIR}/{PINCODE_FILE} to place districts."
+            )
+        elif geo_data.empty:
+            st.info("🗺️ No locations with known coordinates to map")
+        else:
+            geo_data['size'] = geo_data['enrolments'] / max(geo_data['enrolments'].max(), 1) * 100
+            hover_name = 'district' if level == 'district' else 'state_name'
+            title = f"Geographic Distribution of Aadhaar Performance by {level.title()}"
+            
+            if level == 'state' and self.geo_index.state_geojson is not None:
+                fig = px.choropleth(geo_data,
+                                    geojson=self.geo_index.state_geojson,
+                                    locations='state_name',
+                                    color='success_rate',
+                                    hover_name='state_name',
+                                    hover_data=['enrolments', 'success_rate', 'digital_literacy'],
+                                    title=title,
+                                    color_continuous_scale='Viridis',
+                                    template='plotly_white')
+                fig.update_geos(fitbounds="locations", visible=False)
+            else:
+                # Create geographic scatter plot
+                fig = px.scatter_geo(geo_data,
+                                    lat='lat',
+                                    lon='lon',
+                                    size='size',
+                                    color='success_rate',
+                                    hover_name=hover_name,
+                                    hover_data=['state_name', 'enrolments', 'success_rate', 'digital_literacy'],
+                                    title=title,
+                                    color_continuous_scale='Viridis',
+                                    projection='natural earth',
+                                    template='plotly_white')
+                
+                fig.update_geos(
+                    showland=True,
+                    landcolor="lightgray",
+                    showcountries=True,
+                    showcoastlines=True,
+                    countrycolor="white",
+                    coastlinecolor="white",
+                    fitbounds="locations"
+                )
+            
+            fig.update_layout(
+                geo=dict(
+                    bgcolor='rgba(255,255,255,0.1)',
+                    lakecolor='rgba(255,255,255,0.1)'
+                )
+            )
+            
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         
         # Additional geographic insights
         col1, col2 = st.columns(2)
         
         with col1:
-            # Regional performance
-            fig = px.box(df, x='state', y='success_rate',
-                        title="📊 Success Rate Distribution by State",
-                        template='plotly_white')
+            # Regional performance: five numbers per state, not every row
+            boxes = self.get_state_quantiles(df, 'success_rate')
+            fig = go.Figure(go.Box(x=boxes['state'], q1=boxes['q1'], median=boxes['median'],
+                                   q3=boxes['q3'], lowerfence=boxes['lowerfence'],
+                                   upperfence=boxes['upperfence'], name='success_rate'))
+            fig.update_layout(title="📊 Success Rate Distribution by State", template='plotly_white',
+                              xaxis_title='state', yaxis_title='success_rate')
             fig.update_xaxes(tickangle=45)
             st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         
         with col2:
             # Heatmap of performance metrics
-            heatmap_data = df.pivot_table(values='success_rate', 
-                                         index='state', 
-                                         columns='quarter',
-                                         aggfunc='mean').fillna(0)
+            heatmap_data = cube.pivot('success_rate', index='state', columns='quarter')
             
             fig = px.imshow(heatmap_data,
                            text_auto='.1f',
@@ -1509,13 +2211,19 @@ class UltimateAadhaarDashboard:
                 avg_cluster_size = len(df) / n_clusters
                 st.metric("Avg Cluster Size", f"{avg_cluster_size:.0f}")
             
+            if results.get('engine') == 'minibatch':
+                matrix_mb = len(df) * len(results['features']) * 4 / 1024 ** 2
+                st.caption(f"⚡ Mini-batch K-Means in chunks of {results['chunk_rows']:,} rows "
+                           f"(memory budget {results['memory_budget_mb']} MB per chunk, "
+                           f"plus the {matrix_mb:.0f} MB feature matrix)")
+            elif results.get('engine') == 'saved':
+                st.caption(f"📦 Assigned with saved model '{results['model_name']}' (no refit)")
+            
             # Cluster visualization
             st.markdown("#### 📈 **Cluster Visualization**")
             
             if 'pca_coords' in results:
-                pca_df = pd.DataFrame(results['pca_coords'], columns=['PC1', 'PC2'])
-                pca_df['Cluster'] = results['clusters']
-                pca_df['Cluster'] = pca_df['Cluster'].astype(str)
+                pca_df = self.projection_sample(results)
                 pca_df['Size'] = 20
                 
                 fig = px.scatter(pca_df, x='PC1', y='PC2', color='Cluster',
@@ -1529,17 +2237,15 @@ class UltimateAadhaarDashboard:
             # Cluster characteristics
             st.markdown("#### 🔍 **Cluster Characteristics**")
             
-            if 'df_clustered' in results:
-                clustered_df = results['df_clustered']
+            if 'cluster_stats' in results:
+                profile = results['cluster_stats'].set_index('label')
                 
-                # Analyze cluster characteristics
-                cluster_stats = clustered_df.groupby('cluster').agg({
-                    'enrolments': 'mean',
-                    'success_rate': 'mean',
-                    'digital_literacy': 'mean',
-                    'avg_age': 'mean',
-                    'is_anomaly': 'mean'
-                }).round(3)
+                # Per-cluster feature means plus spread around the centroid
+                mean_cols = [col for col in profile.columns if col.startswith('mean_')]
+                extra_cols = [col for col in ('avg_distance', 'max_distance', 'anomaly_rate') if col in profile.columns]
+                cluster_stats = profile[mean_cols + extra_cols].rename(
+                    columns=lambda col: col[len('mean_'):] if col.startswith('mean_') else col
+                ).round(3)
                 
                 # Display cluster statistics - FIXED: Removed background_gradient
                 if HAS_MATPLOTLIB:
@@ -1553,29 +2259,25 @@ class UltimateAadhaarDashboard:
                 # Cluster profiles
                 st.markdown("#### 👥 **Cluster Profiles**")
                 
-                profiles = []
-                for cluster_id in cluster_stats.index:
-                    profile = {
-                        'Cluster': f'Group {cluster_id + 1}',
-                        'Size': len(clustered_df[clustered_df['cluster'] == cluster_id]),
-                        'Avg Enrolments': f"{cluster_stats.loc[cluster_id, 'enrolments']:,.0f}",
-                        'Success Rate': f"{cluster_stats.loc[cluster_id, 'success_rate'] * 100:.1f}%",
-                        'Digital Literacy': f"{cluster_stats.loc[cluster_id, 'digital_literacy'] * 100:.1f}%",
-                        'Anomaly Rate': f"{cluster_stats.loc[cluster_id, 'is_anomaly'] * 100:.1f}%"
-                    }
-                    profiles.append(profile)
-                
-                profiles_df = pd.DataFrame(profiles)
+                profiles_df = pd.DataFrame({'Cluster': profile.index, 'Size': profile['size'].to_numpy()})
+                if 'mean_enrolments' in profile.columns:
+                    profiles_df['Avg Enrolments'] = profile['mean_enrolments'].map('{:,.0f}'.format).to_numpy()
+                for col, title in (('success_rate', 'Success Rate'), ('digital_literacy', 'Digital Literacy')):
+                    if f'mean_{col}' in profile.columns:
+                        profiles_df[title] = (profile[f'mean_{col}'] * 100).map('{:.1f}%'.format).to_numpy()
+                if 'anomaly_rate' in profile.columns:
+                    profiles_df['Anomaly Rate'] = (profile['anomaly_rate'] * 100).map('{:.1f}%'.format).to_numpy()
                 st.dataframe(profiles_df)
             
             # Download clustered data
             st.markdown("#### 📥 **Export Clustered Data**")
             
-            if 'df_clustered' in results:
-                csv = results['df_clustered'].to_csv(index=False)
+            if 'cluster_labels' in results:
+                dataset_key = self.frame_key()
                 st.download_button(
                     label="Download Clustered Dataset",
-                    data=csv,
+                    data=lambda: self.clustered_frame(df, results, dataset_key=dataset_key,
+                                                      with_projection=True).to_csv(index=False),
                     file_name="aadhaar_clustered_data.csv",
                     mime="text/csv",
                     width='stretch',
@@ -1604,42 +2306,92 @@ class UltimateAadhaarDashboard:
             """, unsafe_allow_html=True)
             
             # Quick clustering button
-            if st.button("🚀 Perform Quick Clustering", width='stretch', type="primary", key="quick_cluster"):
-                with st.spinner("Running clustering algorithm..."):
-                    results = self.perform_clustering(df, 3)
-                    if results:
-                        st.session_state.clustering_results = results
-                        st.success("✅ Clustering completed successfully!")
-                        st.rerun()
+            if st.button("🚀 Perform Quick Clustering", width='stretch', type="primary", key="quick_cluster",
+                         disabled=bool(st.session_state.clustering_job)):
+                results = self.request_clustering(df, 3)
+                if results:
+                    st.session_state.clustering_results = results
+                    st.session_state.job_notice = ('success', "✅ Clustering completed successfully!")
+                st.rerun()
+        
+        # Data-driven choice of k
+        self.show_k_sweep(df, "standard", lambda k: self.apply_clustering_k(df, k))
+        
+        self.show_saved_models(df, "standard")
+    
+    def isolation_results(self, dataset_key):
+        """Isolation Forest results for dataset_key from the shared cache or this session"""
+        results = self.data_cache.get(('isolation', dataset_key)) if dataset_key is not None else None
+        if results is None:
+            results = st.session_state.isolation_results
+            if results is not None and results.get('dataset_key') != dataset_key:
+                results = None
+        return results
+    
+    def isolation_frame(self, df):
+        """Active dataset with Isolation Forest flags, or None (with a run button) until scored"""
+        results = self.isolation_results(self.active_dataset_key())
+        if results is None:
+            st.caption(f"Scores every row across {len(select_features(df))} numeric features; "
+                       f"trained on a bounded sample, scored in parallel batches")
+            if st.button("🌲 Run Isolation Forest", type="primary", key="run_isolation",
+                         disabled=bool(st.session_state.clustering_job)):
+                self.request_isolation(df, self.active_dataset_key())
+                st.rerun()
+            return None
+        
+        st.caption(f"🌲 Trained on {results['train_rows']:,} rows • scored {len(df):,} rows in "
+                   f"{results['n_batches']} batches • {results['seconds']:.1f}s")
+        return self.cached_aggregation(('isolation_frame',), lambda: df.assign(
+            is_anomaly=results['is_anomaly'], anomaly_score=results['anomaly_score']
+        ))
     
     def show_enhanced_anomalies(self, df):
         """Show enhanced anomaly analysis"""
-        anomalies = df[df['is_anomaly'] == 1]
+        method = st.radio("Detection method", ["📈 Seasonal z-score", "🌲 Isolation Forest (multivariate)"],
+                          horizontal=True, key="anomaly_method")
+        
+        scored = None
+        if method.startswith("🌲"):
+            scored = self.isolation_frame(df)
+            if scored is None:
+                return
+            cube = self.cached_aggregation(('cube', 'isolation'), lambda: OlapCube(scored))
+        else:
+            cube = self.get_cube(df)
+        kpis = cube.kpis()
         
-        if not anomalies.empty:
+        if kpis['anomalies'] > 0:
+            if scored is None:
+                anomalies = self.get_anomaly_rows(df)
+            else:
+                anomalies = self.cached_aggregation(('anomaly_rows', 'isolation'),
+                                                    lambda: scored[scored['is_anomaly'] == 1])
+            
             # Anomaly summary
             st.markdown("### 🚨 **Anomaly Detection Dashboard**")
             
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("Total Anomalies", len(anomalies))
+                st.metric("Total Anomalies", kpis['anomalies'])
             
             with col2:
-                st.metric("States Affected", anomalies['state'].nunique())
+                st.metric("States Affected", kpis['anomaly_states'])
             
             with col3:
-                avg_score = anomalies['anomaly_score'].mean() * 100
+                avg_score = kpis['anomaly_severity'] * 100
                 st.metric("Avg Severity", f"{avg_score:.1f}%")
             
             with col4:
-                impact = (anomalies['enrolments'].sum() / df['enrolments'].sum()) * 100
+                impact = kpis['anomaly_impact'] * 100
                 st.metric("Total Impact", f"{impact:.1f}%")
             
             # Anomaly timeline
             st.markdown("#### 📅 **Anomaly Timeline**")
             
-            anomaly_timeline = anomalies.groupby('date').size().reset_index(name='count')
+            anomaly_timeline = cube.rollup('date', {'is_anomaly': 'sum'}).rename(columns={'is_anomaly': 'count'})
+            anomaly_timeline = anomaly_timeline[anomaly_timeline['count'] > 0]
             fig = px.line(anomaly_timeline, x='date', y='count',
                          title="Anomaly Occurrences Over Time",
                          markers=True,
@@ -1652,20 +2404,24 @@ class UltimateAadhaarDashboard:
             
             display_df = anomalies[['state', 'district', 'date', 'enrolments', 
                                   'success_rate', 'anomaly_score']].copy()
-            display_df['anomaly_score'] = display_df['anomaly_score'].apply(lambda x: f"{x*100:.1f}%")
-            display_df['success_rate'] = display_df['success_rate'].apply(lambda x: f"{x*100:.1f}%")
+            # Sort on the numbers; percentages are only a display format
             display_df = display_df.sort_values('anomaly_score', ascending=False)
+            display_df[['anomaly_score', 'success_rate']] = display_df[['anomaly_score', 'success_rate']] * 100
+            percent_columns = {
+                'anomaly_score': st.column_config.NumberColumn(format="%.1f%%"),
+                'success_rate': st.column_config.NumberColumn(format="%.1f%%")
+            }
             
             if HAS_MATPLOTLIB:
                 try:
                     st.dataframe(
                         display_df.style.background_gradient(subset=['enrolments'], cmap='Oranges'),
-                        height=400
+                        height=400, column_config=percent_columns
                     )
                 except:
-                    st.dataframe(display_df, height=400)
+                    st.dataframe(display_df, height=400, column_config=percent_columns)
             else:
-                st.dataframe(display_df, height=400)
+                st.dataframe(display_df, height=400, column_config=percent_columns)
             
             # Anomaly patterns
             st.markdown("#### 🎯 **Anomaly Patterns**")
@@ -1674,7 +2430,8 @@ class UltimateAadhaarDashboard:
             
             with col1:
                 # Anomalies by state
-                state_anomalies = anomalies.groupby('state').size().reset_index(name='count')
+                state_anomalies = cube.rollup('state', {'is_anomaly': 'sum'}).rename(columns={'is_anomaly': 'count'})
+                state_anomalies = state_anomalies[state_anomalies['count'] > 0]
                 state_anomalies = state_anomalies.sort_values('count', ascending=False)
                 
                 fig = px.bar(state_anomalies, x='count', y='state', orientation='h',
@@ -1709,6 +2466,40 @@ class UltimateAadhaarDashboard:
                 </div>
             </div>
             """, unsafe_allow_html=True)
+        
+        self.show_stream_monitor()
+    
+    def show_stream_monitor(self):
+        """Latest batch scored by the streaming anomaly scorer"""
+        stream = self.anomaly_scorer.stats()
+        
+        with st.expander("📡 Streaming Monitor", expanded=False):
+            if stream['rows_seen'] == 0:
+                st.caption("The streaming scorer learns from UIDAI loads; load real data to start the feed")
+                return
+            
+            batch = self.anomaly_scorer.last_batch
+            flagged = batch[batch['is_anomaly'] == 1] if batch is not None else batch
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Locations Tracked", f"{stream['locations']:,}")
+            with col2:
+                st.metric("Rows Scored", f"{stream['rows_seen']:,}")
+            with col3:
+                st.metric("Flagged in Last Batch", 0 if flagged is None else len(flagged))
+            
+            latest = stream['latest'].strftime('%Y-%m-%d') if stream['latest'] is not None else "—"
+            st.caption(f"Running EW mean / variance and monthly profile per location • "
+                       f"{stream['state_kb']:.0f} KB of state • data up to {latest}")
+            
+            if flagged is not None and len(flagged):
+                display_df = flagged.sort_values('anomaly_score', ascending=False).copy()
+                display_df['anomaly_score'] = display_df['anomaly_score'] * 100
+                display_df['anomaly_z'] = display_df['anomaly_z'].round(2)
+                st.dataframe(display_df, height=300, column_config={
+                    'anomaly_score': st.column_config.NumberColumn(format="%.1f%%")
+                })
     
     def show_enhanced_risks(self, risk_df):
         """Show enhanced risk analysis"""
@@ -1820,8 +2611,9 @@ class UltimateAadhaarDashboard:
         st.markdown("### 💡 **AI-Generated Insights**")
         
         # Calculate key metrics
-        success_rate = (df['successful_enrolments'].sum() / df['enrolments'].sum()) * 100
-        anomaly_count = df['is_anomaly'].sum()
+        kpis = self.get_cube(df).kpis()
+        success_rate = kpis['success_rate'] * 100
+        anomaly_count = kpis['anomalies']
         
         # Create insights cards
         insights = []
@@ -1990,21 +2782,30 @@ class UltimateAadhaarDashboard:
         
         if uploaded_file is not None:
             try:
-                # Show loading animation
-                with st.spinner('✨ Analyzing your data...'):
-                    if uploaded_file.name.endswith('.csv'):
-                        df = pd.read_csv(uploaded_file)
-                    elif uploaded_file.name.endswith('.xlsx'):
-                        df = pd.read_excel(uploaded_file)
-                    elif uploaded_file.name.endswith('.json'):
-                        df = pd.read_json(uploaded_file)
-                    elif uploaded_file.name.endswith('.parquet'):
-                        df = pd.read_parquet(uploaded_file)
-                    else:
-                        st.error("❌ Unsupported file format")
-                        return
-                
-                st.session_state.uploaded_data = df
+                if (st.session_state.upload_key == uploaded_file.file_id
+                        and st.session_state.uploaded_data is not None):
+                    # Same upload as the previous rerun: reuse the parsed, optimized frame
+                    df = st.session_state.uploaded_data
+                else:
+                    # Show loading animation
+                    with st.spinner('✨ Analyzing your data...'):
+                        if uploaded_file.name.endswith('.csv'):
+                            df = pd.read_csv(uploaded_file)
+                        elif uploaded_file.name.endswith('.xlsx'):
+                            df = pd.read_excel(uploaded_file)
+                        elif uploaded_file.name.endswith('.json'):
+                            df = pd.read_json(uploaded_file)
+                        elif uploaded_file.name.endswith('.parquet'):
+                            df = pd.read_parquet(uploaded_file)
+                        else:
+                            st.error("❌ Unsupported file format")
+                            return
+                        
+                        df, schema_report = optimize_frame(df)
+                    
+                    st.session_state.uploaded_data = df
+                    st.session_state.upload_schema_report = schema_report
+                    st.session_state.upload_key = uploaded_file.file_id
                 
                 # Success message
                 st.success(f"""
@@ -2059,6 +2860,18 @@ class UltimateAadhaarDashboard:
             </div>
             """, unsafe_allow_html=True)
     
+    def show_aggregation_savings(self):
+        """Sidebar metric: aggregation work skipped on this rerun"""
+        lookups = self.agg_hits + self.agg_misses
+        if lookups == 0:
+            return
+        st.sidebar.metric(
+            "⚡ Aggregation Time Saved",
+            f"{self.agg_time_saved * 1000:,.1f} ms",
+            f"{self.agg_hits}/{lookups} cached",
+            help="Time this rerun would have spent recomputing unchanged aggregations"
+        )
+    
     # ========== MAIN RUN FUNCTION ==========
     
     def run(self):
@@ -2072,9 +2885,18 @@ class UltimateAadhaarDashboard:
         # Display the mode header - FIXED HTML RENDERING
         st.markdown(self.create_mode_header(), unsafe_allow_html=True)
         
+        # Background clustering job: live progress while running, outcome once
+        if st.session_state.clustering_job:
+            self.show_job_status()
+        if st.session_state.job_notice:
+            kind, text = st.session_state.job_notice
+            getattr(st, kind)(text)
+            st.session_state.job_notice = None
+        
         # Run the selected mode
         if st.session_state.mode == "standard":
             self.run_standard_mode()
+            self.show_aggregation_savings()
         else:
             self.run_universal_mode()
         
@@ -0,0 +1,557 @@
+"""
+🤖 CLUSTERING ENGINE
+K-Means over the numeric columns of a frame. Small frames get the exact
+fit; large ones are fitted and assigned chunk by chunk with mini-batch
+K-Means, so the working memory on top of the shared float32 feature matrix
+stays within a fixed budget. DBSCAN runs on a PCA-reduced space through
+KD-tree neighborhoods, also in chunks
+"""
+
+import os
+import time
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.metrics import silhouette_score
+from sklearn.neighbors import KDTree
+from threadpoolctl import threadpool_limits
+
+from feature_matrix import build_feature_matrix
+
+# Columns that describe the data rather than characterize it
+EXCLUDE_COLUMNS = ['is_anomaly', 'anomaly_score', 'month', 'quarter']
+
+# Above this many rows the mini-batch engine is used
+SCALABLE_ROW_THRESHOLD = 200_000
+
+# Working memory the engine may use per chunk, on top of the shared float32
+# feature matrix (rows x features x 4 bytes), which is always held in full
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Rows used for the mini-batch initial fit and the PCA fit
+MAX_SAMPLE_ROWS = 100_000
+
+# Working bytes per feature value on top of the shared float32 matrix: about
+# two float32 copies (KMeans' centred input or a chunk's centred / residual
+# temporaries); chunks themselves are views of the matrix
+_BYTES_PER_VALUE = np.dtype(np.float32).itemsize * 2
+
+
+def select_features(df):
+    """Numeric columns used for clustering"""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    return [col for col in numeric_cols if col not in EXCLUDE_COLUMNS]
+
+
+def chunk_rows_for_budget(n_features, n_clusters, memory_budget_mb):
+    """Rows per chunk that keep one chunk's matrices inside the budget"""
+    per_row = n_features * _BYTES_PER_VALUE + n_clusters * np.dtype(np.float32).itemsize
+    return max(1_000, int(memory_budget_mb * 1024 ** 2 // per_row))
+
+
+def choose_engine(n_rows, n_features, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """'exact' when the whole matrix fits the budget and the frame is small, else 'minibatch'"""
+    exact_bytes = n_rows * n_features * _BYTES_PER_VALUE
+    if n_rows > SCALABLE_ROW_THRESHOLD or exact_bytes > memory_budget_mb * 1024 ** 2:
+        return 'minibatch'
+    return 'exact'
+
+
+def _report(progress, fraction, message):
+    """Forward progress to the caller's callback (which may raise to cancel)"""
+    if progress is not None:
+        progress(fraction, message)
+
+
+def _sample_rows(matrix, size):
+    """Copy of a reproducible random row sample of the shared matrix"""
+    rng = np.random.default_rng(42)
+    size = min(matrix.n_rows, size)
+    return matrix.X[np.sort(rng.choice(matrix.n_rows, size=size, replace=False))]
+
+
+def _matrix_for(df, features, matrix):
+    """The caller's shared matrix, or a private one when none was passed"""
+    if matrix is None:
+        return build_feature_matrix(df, features)
+    if list(matrix.features) != list(features) or matrix.n_rows != len(df):
+        raise ValueError("Feature matrix does not match the frame")
+    return matrix
+
+
+def _fit_exact(matrix, n_clusters, progress=None):
+    X_scaled = matrix.X
+    _report(progress, 0.1, "Fitting K-Means")
+
+    kmeans = KMeans(n_clusters=min(n_clusters, matrix.n_rows),
+                    random_state=42,
+                    n_init=10)
+    clusters = kmeans.fit_predict(X_scaled)
+    distances = np.linalg.norm(X_scaled - kmeans.cluster_centers_[clusters], axis=1).astype(np.float32)
+
+    return kmeans, clusters, kmeans.inertia_, distances
+
+
+def _fit_minibatch(matrix, n_clusters, chunk_rows, progress=None):
+    n_rows = matrix.n_rows
+    n_chunks = -(-n_rows // chunk_rows)
+
+    # Initial fit on a random sample, then one refinement pass over every chunk
+    X_sample = _sample_rows(matrix, min(chunk_rows, MAX_SAMPLE_ROWS))
+    sample_size = len(X_sample)
+
+    batch_size = min(max(1_024, n_clusters * 256), sample_size)
+    kmeans = MiniBatchKMeans(n_clusters=min(n_clusters, n_rows),
+                             batch_size=batch_size,
+                             random_state=42,
+                             n_init=3)
+    _report(progress, 0.1, "Fitting on sample")
+    kmeans.fit(X_sample)
+    for i, X in enumerate(matrix.chunks(chunk_rows)):
+        _report(progress, 0.3 + 0.3 * i / n_chunks, f"Refining on chunk {i + 1}/{n_chunks}")
+        kmeans.partial_fit(X)
+
+    # Assign labels and accumulate inertia chunk by chunk
+    clusters = np.empty(n_rows, dtype=np.int32)
+    distances = np.empty(n_rows, dtype=np.float32)
+    inertia = 0.0
+    start = 0
+    for i, X in enumerate(matrix.chunks(chunk_rows)):
+        _report(progress, 0.6 + 0.25 * i / n_chunks, f"Assigning chunk {i + 1}/{n_chunks}")
+        labels = kmeans.predict(X)
+        stop = start + len(X)
+        clusters[start:stop] = labels
+        squared = ((X - kmeans.cluster_centers_[labels]) ** 2).sum(axis=1, dtype=np.float64)
+        inertia += float(squared.sum())
+        distances[start:stop] = np.sqrt(squared)
+        start = stop
+
+    return kmeans, clusters, inertia, distances
+
+
+def cluster_frame(df, n_clusters=3, engine='auto', memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                  progress=None, matrix=None):
+    """Fit K-Means on the numeric columns of df
+
+    engine is 'exact', 'minibatch' or 'auto' (picked from the row count and
+    memory budget). matrix is the shared FeatureMatrix for select_features(df);
+    one is built when omitted. progress(fraction, message) is called between
+    stages. pca_coords holds the 2-D projection of a per-cluster sample of
+    rows (their positions are in pca_index); project_rows gives the rest.
+    Raises ValueError when there is nothing to cluster.
+    """
+    features = select_features(df)
+    if len(features) < 2:
+        raise ValueError("Not enough numeric columns for clustering")
+    if len(df) == 0:
+        raise ValueError("No rows to cluster")
+
+    if engine == 'auto':
+        engine = choose_engine(len(df), len(features), memory_budget_mb)
+    if engine not in ('exact', 'minibatch'):
+        raise ValueError(f"Unknown clustering engine: {engine}")
+
+    matrix = _matrix_for(df, features, matrix)
+    budget_rows = chunk_rows_for_budget(len(features), n_clusters, memory_budget_mb)
+    chunk_rows = None
+    if engine == 'exact':
+        kmeans, clusters, inertia, distances = _fit_exact(matrix, n_clusters, progress)
+    else:
+        chunk_rows = budget_rows
+        kmeans, clusters, inertia, distances = _fit_minibatch(matrix, n_clusters, chunk_rows, progress)
+
+    _report(progress, 0.85, "Projecting with incremental PCA")
+    pca = fit_projection(matrix, budget_rows)
+    pca_index = stratified_sample(clusters)
+
+    return {
+        'clusters': clusters,
+        'cluster_centers': kmeans.cluster_centers_,
+        'inertia': inertia,
+        'center_distances': distances,
+        'features': features,
+        'pca_coords': project_rows(matrix, pca, pca_index),
+        'pca_index': pca_index,
+        'pca': pca,
+        'scaler': matrix.scaler(),
+        'kmeans': kmeans,
+        'cluster_sizes': pd.Series(clusters).value_counts().to_dict(),
+        'engine': engine,
+        'chunk_rows': chunk_rows,
+        'memory_budget_mb': memory_budget_mb
+    }
+
+
+# ========== PROJECTION ==========
+
+# Points drawn in cluster scatter plots
+PLOT_SAMPLE_ROWS = 5_000
+
+
+def fit_projection(matrix, chunk_rows, n_components=2):
+    """2-D IncrementalPCA fitted over the in-memory shared matrix one chunk at a time
+
+    Chunking bounds the SVD working set, not the input: the matrix is
+    already resident.
+    """
+    pca = IncrementalPCA(n_components=min(n_components, len(matrix.features)))
+    for X in matrix.chunks(max(chunk_rows, n_components)):
+        # partial_fit needs at least n_components rows; a tiny tail adds nothing
+        if len(X) >= pca.n_components:
+            pca.partial_fit(X)
+    return pca
+
+
+def project_rows(matrix, pca, index=None, chunk_rows=MAX_SAMPLE_ROWS):
+    """float32 2-D projection of the rows at index (every row when None), in chunks"""
+    n_rows = matrix.n_rows if index is None else len(index)
+    coords = np.empty((n_rows, 2), dtype=np.float32)
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        X = matrix.rows(start, stop) if index is None else matrix.X[index[start:stop]]
+        coords[start:stop] = pca.transform(X)[:, :2]
+    return coords
+
+
+def stratified_sample(clusters, size=PLOT_SAMPLE_ROWS, seed=42):
+    """Sorted row positions with every cluster represented
+
+    Every cluster first gets up to size / (4 * n_clusters) rows, so small
+    clusters stay visible next to large ones; the rest of size is shared
+    in proportion to the rows each cluster has left.
+    """
+    clusters = np.asarray(clusters)
+    n_rows = len(clusters)
+    if n_rows <= size:
+        return np.arange(n_rows)
+
+    groups, codes, counts = np.unique(clusters, return_inverse=True, return_counts=True)
+    base = np.minimum(counts, size // (4 * len(groups)))
+    left = counts - base
+    quota = base + np.floor((size - base.sum()) * left / left.sum()).astype(np.int64)
+
+    # Rank rows inside their cluster in random order; keep ranks below the quota
+    order = np.random.default_rng(seed).permutation(n_rows)
+    order = order[np.argsort(codes[order], kind='stable')]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(n_rows) - np.repeat(starts, counts)
+    keep = order[rank < np.repeat(quota, counts)]
+    return np.sort(keep)
+
+
+# ========== CLUSTER PROFILES ==========
+
+NOISE_LABEL = 'Noise'
+
+
+def cluster_labels(clusters, n_clusters=None):
+    """Categorical 'Group N' labels for cluster ids ('Noise' for DBSCAN's -1), built from codes"""
+    clusters = np.asarray(clusters)
+    if n_clusters is None:
+        n_clusters = int(clusters.max()) + 1 if len(clusters) else 0
+    categories = [f'Group {i + 1}' for i in range(n_clusters)]
+    if (clusters < 0).any():
+        # Noise takes the last code so group codes stay equal to cluster ids
+        codes = np.where(clusters < 0, n_clusters, clusters)
+        return pd.Categorical.from_codes(codes, categories + [NOISE_LABEL])
+    return pd.Categorical.from_codes(clusters, categories)
+
+
+def profile_clusters(df, clusters, features, center_distances=None, n_clusters=None):
+    """Per-cluster size, feature means / spread, centroid distances and anomaly rate
+
+    One grouped aggregation over df's columns keyed on the label codes (no
+    frame copy, no per-cluster filtering). Rows are ordered by cluster id
+    with noise last; feature columns are named mean_<col> and std_<col>.
+    """
+    labels = cluster_labels(clusters, n_clusters)
+    codes = labels.codes
+    spec = {col: ['mean', 'std'] for col in features}
+    if 'is_anomaly' in df.columns:
+        # is_anomaly may also be a feature (DBSCAN takes every numeric column)
+        spec.setdefault('is_anomaly', ['mean'])
+    aggregated = df[list(spec)].groupby(codes, sort=True).agg(spec)
+    sizes = np.bincount(codes, minlength=len(labels.categories))[aggregated.index]
+
+    profile = pd.DataFrame({
+        'cluster': np.where(labels.categories[aggregated.index] == NOISE_LABEL, -1, aggregated.index),
+        'label': labels.categories[aggregated.index],
+        'size': sizes,
+        'share': sizes / max(len(codes), 1)
+    })
+    for col in features:
+        profile[f'mean_{col}'] = aggregated[(col, 'mean')].to_numpy()
+        profile[f'std_{col}'] = aggregated[(col, 'std')].fillna(0).to_numpy()
+    if center_distances is not None:
+        distances = pd.Series(center_distances).groupby(codes, sort=True).agg(['mean', 'max'])
+        profile['avg_distance'] = distances['mean'].to_numpy()
+        profile['max_distance'] = distances['max'].to_numpy()
+    if 'is_anomaly' in spec:
+        profile['anomaly_rate'] = aggregated[('is_anomaly', 'mean')].to_numpy()
+    return profile
+
+
+# ========== K SELECTION ==========
+
+# Rows scored by the silhouette of each candidate k
+SILHOUETTE_SAMPLE_ROWS = 10_000
+
+
+def _sweep_rows(matrix, engine):
+    """Rows the sweep fits on: the whole shared matrix (exact) or a bounded sample (mini-batch)"""
+    if engine == 'exact':
+        return matrix.X
+    return _sample_rows(matrix, MAX_SAMPLE_ROWS)
+
+
+def _score_k(X, k, engine):
+    """Fit one candidate k on X; inertia plus a sampled silhouette
+
+    Exact fits centre X in place and restore it (copy_x=False), so X must be
+    a private, writable copy that no other fit is using.
+    """
+    start = time.perf_counter()
+    if engine == 'exact':
+        model = KMeans(n_clusters=k, random_state=42, n_init=10, copy_x=False)
+    else:
+        model = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3,
+                                batch_size=min(max(1_024, k * 256), len(X)))
+    labels = model.fit_predict(X)
+    silhouette = np.nan
+    if 1 < len(np.unique(labels)) < len(X):
+        silhouette = silhouette_score(X, labels, sample_size=min(len(X), SILHOUETTE_SAMPLE_ROWS),
+                                      random_state=42)
+    return {'k': k, 'inertia': float(model.inertia_), 'silhouette': float(silhouette),
+            'fit_seconds': time.perf_counter() - start}
+
+
+def sweep_k(df, k_values=range(2, 11), memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, n_jobs=-1,
+            progress=None, matrix=None):
+    """Fit every candidate k on the shared standardized matrix
+
+    Mini-batch fits run in parallel threads over one shared sample; exact
+    fits run one after another on a single private copy. Returns the per-k table (inertia, silhouette, fit time) and the
+    recommended k: the best silhouette, ties going to the smaller k.
+    """
+    features = select_features(df)
+    if len(features) < 2:
+        raise ValueError("Not enough numeric columns for clustering")
+    k_values = sorted({int(k) for k in k_values if 2 <= k < len(df)})
+    if not k_values:
+        raise ValueError("Not enough rows for the requested k values")
+
+    engine = choose_engine(len(df), len(features), memory_budget_mb)
+    _report(progress, 0.05, "Standardizing features")
+    X = _sweep_rows(_matrix_for(df, features, matrix), engine)
+
+    _report(progress, 0.2, f"Fitting {len(k_values)} candidate k values")
+    wall_start = time.perf_counter()
+    n_jobs = len(k_values) if n_jobs == -1 else max(1, min(n_jobs, len(k_values)))
+    if engine == 'exact':
+        # KMeans centres its input in place, so threads cannot share the matrix:
+        # one private copy is fitted k by k, each fit using every core itself
+        X = np.array(X)
+        limits = nullcontext()
+    else:
+        # Threads share the sample without copies; one BLAS/OpenMP thread each
+        # avoids oversubscription
+        limits = threadpool_limits(limits=1)
+    rows = []
+    with limits:
+        if engine == 'exact':
+            fits = (_score_k(X, k, engine) for k in k_values)
+        else:
+            fits = Parallel(n_jobs=min(n_jobs, os.cpu_count() or 1), prefer='threads',
+                            return_as='generator_unordered')(
+                delayed(_score_k)(X, k, engine) for k in k_values
+            )
+        for row in fits:
+            rows.append(row)
+            _report(progress, 0.2 + 0.8 * len(rows) / len(k_values),
+                    f"Scored k={row['k']} ({len(rows)}/{len(k_values)})")
+    wall_seconds = time.perf_counter() - wall_start
+
+    table = pd.DataFrame(rows).sort_values('k').reset_index(drop=True)
+    ranked = table.dropna(subset=['silhouette'])
+    if len(ranked):
+        best_k = int(ranked.sort_values(['silhouette', 'k'], ascending=[False, True]).iloc[0]['k'])
+    else:
+        best_k = k_values[0]
+
+    return {
+        'table': table,
+        'recommended_k': best_k,
+        'engine': engine,
+        'rows_used': len(X),
+        'wall_seconds': wall_seconds,
+        'serial_seconds': float(table['fit_seconds'].sum())
+    }
+
+
+# ========== DENSITY CLUSTERING ==========
+
+# DBSCAN runs in a PCA space holding this share of the variance
+DBSCAN_VARIANCE_TARGET = 0.9
+DBSCAN_MAX_COMPONENTS = 8
+
+# Sampled rows whose k-distances drive the eps suggestion
+EPS_SAMPLE_ROWS = 5_000
+
+
+def reduce_features(matrix, chunk_rows, progress=None):
+    """PCA-project the shared standardized matrix chunk by chunk
+
+    Returns (reduced matrix, pca, n_components); the component count is the
+    smallest reaching DBSCAN_VARIANCE_TARGET (at least 2).
+    """
+    n_rows = matrix.n_rows
+    n_chunks = -(-n_rows // chunk_rows)
+
+    X_sample = _sample_rows(matrix, MAX_SAMPLE_ROWS)
+    pca = PCA(n_components=min(len(matrix.features), DBSCAN_MAX_COMPONENTS, len(X_sample)),
+              random_state=42)
+    pca.fit(X_sample)
+    explained = np.cumsum(pca.explained_variance_ratio_)
+    n_components = max(2, int(np.searchsorted(explained, DBSCAN_VARIANCE_TARGET) + 1))
+    n_components = min(n_components, pca.n_components_)
+
+    # KD-trees work in float64
+    X_reduced = np.empty((n_rows, n_components))
+    start = 0
+    for i, X in enumerate(matrix.chunks(chunk_rows)):
+        _report(progress, 0.3 * i / n_chunks, f"Projecting chunk {i + 1}/{n_chunks}")
+        stop = start + len(X)
+        X_reduced[start:stop] = pca.transform(X)[:, :n_components]
+        start = stop
+
+    return X_reduced, pca, n_components
+
+
+def _neighbor_chunk_rows(tree, X, eps, memory_budget_mb):
+    """Rows per radius query so one chunk's neighbor lists fit the budget"""
+    rng = np.random.default_rng(42)
+    probe = X[rng.choice(len(X), size=min(len(X), 1_000), replace=False)]
+    avg_neighbors = tree.query_radius(probe, r=eps, count_only=True).mean()
+    per_row = max(avg_neighbors, 1.0) * 8 * 4 + 64  # index lists plus edge arrays
+    return max(1_000, int(memory_budget_mb * 1024 ** 2 // per_row))
+
+
+def scalable_dbscan(X, eps, min_samples, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, progress=None):
+    """DBSCAN on a low-dimensional matrix using KD-trees and chunked neighborhoods
+
+    Core points and clusters match sklearn's DBSCAN; a border point joins the
+    cluster of its nearest core point. Returns (labels with -1 for noise, core mask).
+    """
+    n_rows = len(X)
+    tree = KDTree(X)
+    chunk_rows = _neighbor_chunk_rows(tree, X, eps, memory_budget_mb)
+
+    # Pass 1: neighbor counts decide the core points
+    counts = np.empty(n_rows, dtype=np.int64)
+    for start in range(0, n_rows, chunk_rows):
+        _report(progress, 0.3 + 0.3 * start / n_rows, "Finding core points")
+        counts[start:start + chunk_rows] = tree.query_radius(X[start:start + chunk_rows], r=eps,
+                                                             count_only=True)
+    core = counts >= min_samples
+    labels = np.full(n_rows, -1, dtype=np.int64)
+    core_idx = np.flatnonzero(core)
+    n_core = len(core_idx)
+    if n_core == 0:
+        return labels, core
+
+    # Pass 2: link core points within eps, folding each chunk's edges into the components
+    core_tree = KDTree(X[core_idx])
+    component = np.arange(n_core)
+    for start in range(0, n_core, chunk_rows):
+        _report(progress, 0.6 + 0.25 * start / n_core, "Linking core points")
+        stop = min(start + chunk_rows, n_core)
+        neighbors = core_tree.query_radius(X[core_idx[start:stop]], r=eps)
+        sizes = np.fromiter((len(n) for n in neighbors), dtype=np.int64, count=len(neighbors))
+        src = component[np.repeat(np.arange(start, stop), sizes)]
+        dst = component[np.concatenate(neighbors)]
+        graph = coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n_core, n_core))
+        _, merged = connected_components(graph, directed=False)
+        component = merged[component]
+    _, component = np.unique(component, return_inverse=True)
+    labels[core_idx] = component
+
+    # Pass 3: border points take the cluster of their nearest core point within eps
+    border_idx = np.flatnonzero(~core)
+    for start in range(0, len(border_idx), chunk_rows):
+        _report(progress, 0.85 + 0.15 * start / max(len(border_idx), 1), "Assigning border points")
+        rows = border_idx[start:start + chunk_rows]
+        dist, nearest = core_tree.query(X[rows], k=1)
+        within = dist[:, 0] <= eps
+        labels[rows[within]] = component[nearest[within, 0]]
+
+    return labels, core
+
+
+def suggest_eps(X, min_samples=5, sample_rows=EPS_SAMPLE_ROWS, tree=None):
+    """eps at the knee of the sorted k-distance curve
+
+    k-distances are computed for a sample of rows against an index over the
+    full matrix. Returns (eps, sorted k-distances).
+    """
+    tree = tree if tree is not None else KDTree(X)
+    rng = np.random.default_rng(42)
+    sample = X[rng.choice(len(X), size=min(len(X), sample_rows), replace=False)]
+    dist, _ = tree.query(sample, k=min(min_samples, len(X)))
+    k_distances = np.sort(dist[:, -1])
+
+    span = k_distances[-1] - k_distances[0]
+    if span <= 0:
+        return float(k_distances[0]), k_distances
+    # Knee: the point farthest below the chord from the first to the last distance
+    x = np.linspace(0.0, 1.0, len(k_distances))
+    y = (k_distances - k_distances[0]) / span
+    knee = int(np.argmax(x - y))
+    return float(k_distances[knee]), k_distances
+
+
+def density_features(df):
+    """Numeric columns used for DBSCAN (every numeric column)"""
+    features = df.select_dtypes(include=[np.number]).columns.tolist()
+    if len(features) < 2:
+        raise ValueError("Need at least 2 numeric columns for clustering")
+    return features
+
+
+def suggest_dbscan_eps(df, min_samples=5, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, matrix=None):
+    """k-distance eps suggestion in the same PCA space dbscan_frame uses"""
+    features = density_features(df)
+    chunk_rows = chunk_rows_for_budget(len(features), 1, memory_budget_mb)
+    X, _, _ = reduce_features(_matrix_for(df, features, matrix), chunk_rows)
+    return suggest_eps(X, min_samples)
+
+
+def dbscan_frame(df, eps=0.5, min_samples=5, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                 progress=None, matrix=None):
+    """Scalable DBSCAN on the PCA-reduced standardized numeric columns of df; -1 marks noise
+
+    matrix is the shared FeatureMatrix for density_features(df).
+    """
+    features = density_features(df)
+    chunk_rows = chunk_rows_for_budget(len(features), 1, memory_budget_mb)
+    X, pca, n_components = reduce_features(_matrix_for(df, features, matrix), chunk_rows, progress)
+    clusters, core = scalable_dbscan(X, eps, min_samples, memory_budget_mb, progress)
+    pca_index = stratified_sample(clusters)
+
+    return {
+        'clusters': clusters,
+        'features': features,
+        'n_clusters': int(clusters.max()) + 1,
+        'noise_points': int((clusters == -1).sum()),
+        'core_points': int(core.sum()),
+        'pca_coords': X[pca_index, :2].astype(np.float32),
+        'pca_index': pca_index,
+        'pca': pca,
+        'n_components': n_components,
+        'explained_variance': float(pca.explained_variance_ratio_[:n_components].sum())
+    }
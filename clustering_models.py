@@ -0,0 +1,168 @@
+"""
+📦 PERSISTED CLUSTERING MODELS
+A fitted K-Means model reduced to plain arrays (standardization, centers,
+feature list and the 2-D projection) and saved under data/models. New rows
+are assigned to the saved clusters with a vectorized nearest-center pass,
+so labels stay stable across monthly drops without refitting
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+
+import joblib
+import numpy as np
+
+DEFAULT_MODEL_DIR = os.path.join("data", "models")
+MODEL_SUFFIX = ".joblib"
+
+# Rows standardized and scored per block during assignment
+ASSIGN_CHUNK_ROWS = 250_000
+
+
+def _slug(name):
+    """File-system safe model name
+
+    Names that differ only in punctuation or spacing sanitize alike, so a
+    short hash of the exact name keeps their files apart.
+    """
+    name = name.strip()
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '-', name).strip('-')
+    if not slug:
+        raise ValueError("Model name must contain letters or digits")
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+    return f"{slug}-{digest}"
+
+
+class ClusteringModel:
+    def __init__(self, name, features, mean, scale, centers, pca_mean=None, pca_components=None,
+                 n_rows=0, engine=None, created_at=None):
+        self.name = name
+        self.features = list(features)
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.centers = np.asarray(centers, dtype=np.float64)
+        self.pca_mean = None if pca_mean is None else np.asarray(pca_mean, dtype=np.float64)
+        self.pca_components = None if pca_components is None else np.asarray(pca_components, dtype=np.float64)
+        self.n_rows = n_rows
+        self.engine = engine
+        self.created_at = created_at or time.time()
+
+    @property
+    def n_clusters(self):
+        return len(self.centers)
+
+    @classmethod
+    def from_results(cls, name, results):
+        """Model from cluster_frame() results (K-Means only)"""
+        if 'cluster_centers' not in results or 'scaler' not in results:
+            raise ValueError("Only K-Means results can be saved as a model")
+        scaler = results['scaler']
+        pca = results.get('pca')
+        return cls(name=name,
+                   features=results['features'],
+                   mean=scaler.mean_,
+                   scale=scaler.scale_,
+                   centers=results['cluster_centers'],
+                   pca_mean=None if pca is None else pca.mean_,
+                   pca_components=None if pca is None else pca.components_,
+                   n_rows=len(results['clusters']),
+                   engine=results.get('engine'))
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'features': self.features,
+            'mean': self.mean_,
+            'scale': self.scale_,
+            'centers': self.centers,
+            'pca_mean': self.pca_mean,
+            'pca_components': self.pca_components,
+            'n_rows': self.n_rows,
+            'engine': self.engine,
+            'created_at': self.created_at
+        }
+
+    def missing_features(self, df):
+        return [col for col in self.features if col not in df.columns]
+
+    def _standardized(self, df, start, stop):
+        block = df.iloc[start:stop][self.features].fillna(0).to_numpy(dtype='float64')
+        return (block - self.mean_) / self.scale_
+
+    def assign(self, df, chunk_rows=ASSIGN_CHUNK_ROWS):
+        """Nearest saved center for every row of df
+
+        Rows are standardized with the saved mean/scale (NaN -> 0, as at fit
+        time) block by block; squared distances come from
+        |x|^2 - 2 x.c + |c|^2 so each block costs one matrix product.
+        Returns labels and distances to the assigned center.
+        """
+        missing = self.missing_features(df)
+        if missing:
+            raise ValueError(f"Frame is missing model features: {', '.join(missing)}")
+
+        n_rows = len(df)
+        labels = np.empty(n_rows, dtype=np.int32)
+        distances = np.empty(n_rows, dtype=np.float64)
+        center_norms = (self.centers ** 2).sum(axis=1)
+
+        for start in range(0, n_rows, chunk_rows):
+            X = self._standardized(df, start, start + chunk_rows)
+            stop = start + len(X)
+            d2 = (X ** 2).sum(axis=1)[:, None] - 2 * X @ self.centers.T + center_norms
+            block_labels = d2.argmin(axis=1)
+            labels[start:stop] = block_labels
+            distances[start:stop] = np.sqrt(np.maximum(d2[np.arange(len(X)), block_labels], 0))
+
+        return labels, distances
+
+    def project(self, df, index=None, chunk_rows=ASSIGN_CHUNK_ROWS):
+        """float32 2-D projection of the rows at index (every row when None) on the saved axes"""
+        if self.pca_components is None:
+            raise ValueError("Model was saved without a projection")
+        if index is not None:
+            df = df.iloc[index]
+        coords = np.empty((len(df), 2), dtype=np.float32)
+        for start in range(0, len(df), chunk_rows):
+            X = self._standardized(df, start, start + chunk_rows)
+            coords[start:start + len(X)] = (X - self.pca_mean) @ self.pca_components[:2].T
+        return coords
+
+    def save(self, model_dir=DEFAULT_MODEL_DIR):
+        """Write the model atomically and return its path"""
+        os.makedirs(model_dir, exist_ok=True)
+        path = os.path.join(model_dir, _slug(self.name) + MODEL_SUFFIX)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(self.to_dict(), tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        payload = joblib.load(path)
+        if not isinstance(payload, dict):
+            raise ValueError(f"{path} is not a saved clustering model")
+        return cls(**{k: payload.get(k) for k in ('name', 'features', 'mean', 'scale', 'centers',
+                                                  'pca_mean', 'pca_components', 'n_rows', 'engine',
+                                                  'created_at')})
+
+
+def list_models(model_dir=DEFAULT_MODEL_DIR):
+    """Saved models, newest first (unreadable files are skipped)"""
+    if not os.path.isdir(model_dir):
+        return []
+    models = []
+    for name in os.listdir(model_dir):
+        if name.endswith(MODEL_SUFFIX):
+            try:
+                models.append(ClusteringModel.load(os.path.join(model_dir, name)))
+            except (OSError, EOFError, ValueError, KeyError, TypeError):
+                continue
+    return sorted(models, key=lambda model: model.created_at, reverse=True)
+
+
+def load_model(name, model_dir=DEFAULT_MODEL_DIR):
+    return ClusteringModel.load(os.path.join(model_dir, _slug(name) + MODEL_SUFFIX))
@@ -0,0 +1,189 @@
+"""
+💾 CLUSTERING RESULT STORE
+Fitted clustering results keyed on a content hash of the feature matrix
+plus the algorithm and its parameters. Recent results stay in memory;
+every result is also spilled to disk so identical requests from any
+session, or after a restart, skip the fit entirely
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join("data", "cache", "clustering")
+RESULT_SUFFIX = ".joblib"
+
+# Bumped whenever the shape of stored results changes, so older spills are never reused
+RESULT_FORMAT = 3
+
+
+def feature_fingerprint(df, features):
+    """Content hash of the feature columns (values, names and dtypes, not the index)"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[str(c), str(df[c].dtype)] for c in features]).encode('utf-8'))
+    digest.update(np.int64(len(df)).tobytes())
+    if len(df):
+        row_hashes = pd.util.hash_pandas_object(df[features], index=False).to_numpy()
+        digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def result_key(fingerprint, algorithm, params):
+    """Store key for one fit: data fingerprint + algorithm + sorted params"""
+    payload = json.dumps({'data': fingerprint, 'algorithm': algorithm, 'params': params,
+                          'format': RESULT_FORMAT},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ClusteringResultStore:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_memory_entries=8, max_disk_mb=512):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_mb = max_disk_mb
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + RESULT_SUFFIX)
+
+    def _remember(self, key, results):
+        with self._lock:
+            self._memory[key] = results
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Results for key from memory, then disk; None if never stored"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            results = joblib.load(path)
+            os.utime(path)  # disk eviction is least-recently-used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception:
+            # Truncated or unpicklable spill (e.g. written by another version):
+            # drop it so the result is refitted and stored again
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, results)
+        return results
+
+    def put(self, key, results):
+        """Keep results in memory and spill them to disk"""
+        self._remember(key, results)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            joblib.dump(results, tmp_path)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError:
+            # A read-only or full disk only costs the persistence
+            pass
+
+    def get_or_compute(self, key, compute):
+        """Return stored results for key, fitting at most once across sessions"""
+        results = self.get(key)
+        if results is not None:
+            return results
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                with self._lock:
+                    results = self._memory.get(key)
+                    if results is not None:
+                        # Fitted by another session while we waited: a hit after all
+                        self.misses -= 1
+                        self.memory_hits += 1
+                if results is None:
+                    results = compute()
+                    self.put(key, results)
+        finally:
+            # Also when compute() raises, or failed keys would pile up
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return results
+
+    def _disk_entries(self):
+        """(mtime, size, path) for every spilled result, oldest first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(RESULT_SUFFIX):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+        return sorted(entries)
+
+    def _evict_disk(self):
+        """Delete least-recently-used spill files until under max_disk_mb"""
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_disk_mb * 1024 ** 2
+        for _, size, path in entries[:-1]:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Forget every result in memory and on disk"""
+        with self._lock:
+            self._memory.clear()
+        if os.path.isdir(self.cache_dir):
+            for _, _, path in self._disk_entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Hit counters plus memory and disk footprint"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk = self._disk_entries() if os.path.isdir(self.cache_dir) else []
+            return {
+                'memory_entries': len(self._memory),
+                'disk_entries': len(disk),
+                'disk_mb': sum(size for _, size, _ in disk) / 1024 ** 2,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,168 @@
+"""
+📐 COLUMN PROFILE
+describe()-style statistics, IQR outlier bounds and counts, skewness and
+kurtosis for every numeric column of a frame, computed as array
+reductions over float blocks instead of one pandas call per column, or
+approximately from mergeable quantile sketches when the rows are too many
+to sort
+"""
+
+import numpy as np
+import pandas as pd
+
+# Float64 working memory per column block (values, sorted copy and temporaries)
+PROFILE_BLOCK_MB = 256
+
+# Tukey fences: Q1 - k * IQR and Q3 + k * IQR
+IQR_MULTIPLIER = 1.5
+
+# Statistics shown as the describe() table
+DESCRIBE_ROWS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+PROFILE_COLUMNS = DESCRIBE_ROWS + ['iqr', 'lower_bound', 'upper_bound', 'outliers', 'outlier_pct',
+                                   'skewness', 'kurtosis']
+
+# Statistics profile_sketch() can only approximate
+SKETCH_APPROXIMATE = ['25%', '50%', '75%', 'iqr', 'lower_bound', 'upper_bound', 'outliers', 'outlier_pct']
+
+
+def _block_columns(n_rows, n_columns, block_mb=PROFILE_BLOCK_MB):
+    """Columns per block so one block's float64 working set fits block_mb"""
+    return max(1, min(n_columns, int(block_mb * 1024 ** 2 // max(n_rows * 8 * 4, 1))))
+
+
+def _sorted_quantiles(X_sorted, count, probs):
+    """Linear-interpolated quantiles per column of a column-sorted block (NaN sorted last)"""
+    n_cols = X_sorted.shape[1]
+    columns = np.arange(n_cols)
+    out = np.full((len(probs), n_cols), np.nan)
+    if not len(X_sorted):
+        return out
+    has = count > 0
+    for i, p in enumerate(probs):
+        position = (count - 1) * p
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, np.maximum(count - 1, 0))
+        below = np.maximum(below, 0)
+        lo = X_sorted[below, columns]
+        hi = X_sorted[above, columns]
+        out[i] = np.where(has, lo + (hi - lo) * (position - below), np.nan)
+    return out
+
+
+def _shape(count, B, C, D, mean):
+    """Unbiased skewness and excess kurtosis from centred power sums (pandas' definitions)"""
+    n = count.astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skew = np.sqrt(n * (n - 1)) / (n - 2) * (np.sqrt(n) * C / B ** 1.5)
+        kurt = (n * (n + 1) * (n - 1) * D) / (B ** 2 * (n - 2) * (n - 3)) \
+            - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+
+    # Constant columns have no shape; too few values leave it undefined
+    flat = B <= 1e-14 * np.maximum(n * np.nan_to_num(mean) ** 2, 1.0)
+    skew = np.where(n < 3, np.nan, np.where(flat, 0.0, skew))
+    kurt = np.where(n < 4, np.nan, np.where(flat, 0.0, kurt))
+    return skew, kurt
+
+
+def _profile_block(X, iqr_multiplier):
+    """Statistics for one (rows x columns) float64 block"""
+    n_rows = X.shape[0]
+    X_sorted = np.sort(X, axis=0)
+    count = n_rows - np.isnan(X_sorted).sum(axis=0)
+    q1, median, q3, minimum, maximum = _sorted_quantiles(X_sorted, count, [0.25, 0.5, 0.75, 0.0, 1.0])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nansum(X, axis=0) / count
+        centred = X - mean
+        np.nan_to_num(centred, copy=False, nan=0.0)
+        squared = centred * centred
+        B = squared.sum(axis=0)
+        C = (squared * centred).sum(axis=0)
+        D = (squared * squared).sum(axis=0)
+        std = np.where(count > 1, np.sqrt(B / (count - 1)), np.nan)
+
+    iqr = q3 - q1
+    lower = q1 - iqr_multiplier * iqr
+    upper = q3 + iqr_multiplier * iqr
+    with np.errstate(invalid='ignore'):
+        outliers = (X < lower).sum(axis=0) + (X > upper).sum(axis=0)
+    skew, kurt = _shape(count, B, C, D, mean)
+
+    return {
+        'count': count, 'mean': np.where(count > 0, mean, np.nan), 'std': std,
+        'min': minimum, '25%': q1, '50%': median, '75%': q3, 'max': maximum,
+        'iqr': iqr, 'lower_bound': lower, 'upper_bound': upper,
+        'outliers': outliers.astype(np.int64), 'outlier_pct': outliers / max(n_rows, 1),
+        'skewness': skew, 'kurtosis': kurt
+    }
+
+
+def profile_columns(df, columns=None, iqr_multiplier=IQR_MULTIPLIER):
+    """One row per numeric column: describe() stats, IQR bounds, outlier counts, skewness, kurtosis
+
+    Columns are copied to float64 a block at a time (NaN = missing); each
+    block is sorted once, column-wise, for every quantile, min and max,
+    and the remaining statistics are vectorized reductions over it.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    block = _block_columns(len(df), len(columns))
+
+    parts = []
+    for start in range(0, len(columns), block):
+        names = columns[start:start + block]
+        X = np.asfortranarray(df[names].to_numpy(dtype='float64', na_value=np.nan))
+        parts.append(pd.DataFrame(_profile_block(X, iqr_multiplier), index=names))
+
+    if not parts:
+        return pd.DataFrame(columns=PROFILE_COLUMNS, index=pd.Index([], name='column'))
+    profile = pd.concat(parts)
+    profile.index.name = 'column'
+    return profile
+
+
+def profile_sketch(sketch, columns=None, iqr_multiplier=IQR_MULTIPLIER):
+    """profile_columns() answered from a FrameSketch instead of the rows
+
+    Moments (count, mean, std, skewness, kurtosis) and min/max are exact;
+    quartiles, bounds and outlier counts carry the sketch's rank error. On
+    columns with few distinct values a small rank error can still move a
+    quartile to a neighbouring value, far from the exact one in units.
+    """
+    columns = sketch.columns if columns is None else [c for c in columns if c in sketch.sketches]
+    if not columns:
+        return pd.DataFrame(columns=PROFILE_COLUMNS, index=pd.Index([], name='column'))
+
+    count, mean, B, C, D = (np.array(values, dtype=np.float64)
+                            for values in zip(*(sketch.moments[name] for name in columns)))
+    quartiles = np.array([sketch.sketches[name].quantiles([0.0, 0.25, 0.5, 0.75, 1.0]) for name in columns])
+    minimum, q1, median, q3, maximum = quartiles.T
+
+    iqr = q3 - q1
+    lower = q1 - iqr_multiplier * iqr
+    upper = q3 + iqr_multiplier * iqr
+    outside = np.array([
+        sketch.sketches[name].cdf(lo) + 1 - sketch.sketches[name].cdf(hi, inclusive=True)
+        if sketch.sketches[name].n else 0.0
+        for name, lo, hi in zip(columns, lower, upper)
+    ])
+    outliers = np.round(outside * count).astype(np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.where(count > 1, np.sqrt(B / (count - 1)), np.nan)
+    skew, kurt = _shape(count, B, C, D, mean)
+
+    profile = pd.DataFrame({
+        'count': count.astype(np.int64), 'mean': np.where(count > 0, mean, np.nan), 'std': std,
+        'min': minimum, '25%': q1, '50%': median, '75%': q3, 'max': maximum,
+        'iqr': iqr, 'lower_bound': lower, 'upper_bound': upper,
+        'outliers': outliers, 'outlier_pct': outliers / max(sketch.rows, 1),
+        'skewness': skew, 'kurtosis': kurt
+    }, index=pd.Index(columns, name='column'))
+    return profile
+
+
+def label_approximate(profile):
+    """Copy of a sketch profile with its approximate statistics marked '≈' for display"""
+    return profile.rename(columns={name: f"{name} ≈" for name in SKETCH_APPROXIMATE})
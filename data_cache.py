@@ -0,0 +1,106 @@
+"""
+🧠 PROCESS-WIDE DATA CACHE
+Keyed cache with TTL and LRU eviction shared by every browser session,
+so sample data, risk data and clustering results are built once per
+server process instead of once per session
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class DataCache:
+    def __init__(self, max_entries=64, default_ttl=3600):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, compute_seconds)
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, expires_at):
+        return expires_at is not None and time.monotonic() >= expires_at
+
+    def get(self, key, default=None):
+        """Return a cached value (refreshing its LRU position) or default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[1]):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None, compute_seconds=0.0):
+        """Store a value; ttl=None uses the default, ttl=0 never expires"""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at, compute_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Return the cached value for key, computing it at most once across sessions"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                # Another session may have filled it while we waited: a hit after all
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and not self._expired(entry[1]):
+                        self._entries.move_to_end(key)
+                        self.misses -= 1
+                        self.hits += 1
+                        return entry[0]
+
+                start = time.perf_counter()
+                value = compute()
+                self.put(key, value, ttl, time.perf_counter() - start)
+        finally:
+            # Also when compute() raises, or failed keys would pile up
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return value
+
+    def compute_seconds(self, key):
+        """How long the cached value for key took to build (0 if absent)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2] if entry is not None else 0.0
+
+    def invalidate(self, predicate=None):
+        """Drop every entry whose key matches predicate (all entries if None)"""
+        with self._lock:
+            keys = [k for k in self._entries if predicate is None or predicate(k)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
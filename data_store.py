@@ -0,0 +1,48 @@
+"""
+🗄️ SHARED DATASET STORE
+Keeps the loaded UIDAI frames once per server process so every browser
+session reads the same objects instead of holding its own copy
+"""
+
+import threading
+from datetime import datetime
+
+
+class SharedDatasetStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frames = {}
+        self.standard = None
+        self.stats = None
+        self.version = 0
+        self.loaded_at = None
+
+    def publish(self, frames, standard, stats=None):
+        """Swap in a freshly loaded dataset and bump the version"""
+        with self._lock:
+            self.frames = dict(frames)
+            self.standard = standard
+            self.stats = stats
+            self.version += 1
+            self.loaded_at = datetime.now()
+            return self.version
+
+    def clear(self):
+        """Drop the loaded dataset (sessions fall back to sample data)"""
+        with self._lock:
+            self.frames = {}
+            self.standard = None
+            self.stats = None
+            self.version += 1
+            self.loaded_at = None
+
+    def is_loaded(self):
+        """True once real data has been published"""
+        return self.standard is not None
+
+    def memory_mb(self):
+        """Deep memory footprint of everything held by the store"""
+        frames = list(self.frames.values())
+        if self.standard is not None:
+            frames.append(self.standard)
+        return sum(frame.memory_usage(deep=True).sum() for frame in frames) / (1024 * 1024)
@@ -0,0 +1,152 @@
+"""
+🧬 SCHEMA INFERENCE & DTYPE DOWNCASTING
+Ingestion-time pass that shrinks UIDAI frames: categoricals for location
+columns, the narrowest safe integer width for counts and dates parsed once
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Always stored as categoricals when present
+CATEGORY_COLUMNS = ['state', 'district', 'pincode']
+
+# Other text columns become categoricals below this unique/rows ratio
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# A text column is treated as dates if at least this share parses
+DATE_MIN_PARSED_RATIO = 0.9
+
+# Whole name tokens that mark a date column ('update_date', 'Timestamp', not 'updates')
+DATE_NAME_PATTERN = re.compile(r'(^|[_\s])(date|time|timestamp|datetime)($|[_\s])')
+
+# Narrowest integer width used for counts: element-wise sums and differences
+# of int8 / int16 columns overflow silently, int32 leaves room for them
+MIN_INTEGER_DTYPE = np.int32
+
+
+def _is_date_name(name):
+    return DATE_NAME_PATTERN.search(str(name).strip().lower()) is not None
+
+
+def _try_parse_dates(series):
+    """Parse a text column as dates, or return None if it is not one"""
+    non_null = series.notna().sum()
+    if non_null == 0:
+        return None
+    parsed = pd.to_datetime(series, errors='coerce', dayfirst=True, format='mixed')
+    if parsed.notna().sum() / non_null < DATE_MIN_PARSED_RATIO:
+        return None
+    return parsed
+
+
+def _downcast_integers(series):
+    """Smallest signed integer width, but at least int32, that holds every value
+
+    Signed widths keep differences like enrolments - successful from
+    wrapping to huge positives; the int32 floor keeps arithmetic between
+    count columns from overflowing.
+    """
+    series = pd.to_numeric(series, downcast='integer')
+    if series.dtype.itemsize < np.dtype(MIN_INTEGER_DTYPE).itemsize:
+        series = series.astype(MIN_INTEGER_DTYPE)
+    return series
+
+
+def _is_low_cardinality(series):
+    """Text column repetitive enough to be stored as a categorical"""
+    return series.nunique(dropna=True) / max(len(series), 1) < CATEGORY_MAX_UNIQUE_RATIO
+
+
+def _is_integral_float(series):
+    """Float column holding only whole counts (counts read as float64)
+
+    Columns that never exceed 1 are left alone: an all-1.0 rate or an
+    all-0.0 score is a float measure, not a count.
+    """
+    values = series.to_numpy()
+    return (len(values) > 0
+            and np.isfinite(values).all()
+            and np.abs(values).max() > 1
+            and np.array_equal(values, np.round(values)))
+
+
+def infer_schema(df):
+    """Decide a target dtype for every column: {column: 'category' | 'datetime' | 'integer'}"""
+    plan = {}
+
+    for col in df.columns:
+        series = df[col]
+        name = str(col).strip().lower()
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if name in CATEGORY_COLUMNS:
+            plan[col] = 'category'
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            continue
+        elif pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_integer_dtype(series):
+            plan[col] = 'integer'
+        elif pd.api.types.is_float_dtype(series):
+            if _is_integral_float(series):
+                plan[col] = 'integer'
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if _is_date_name(col):
+                plan[col] = 'datetime'
+            elif _is_low_cardinality(series):
+                plan[col] = 'category'
+
+    return plan
+
+
+def optimize_frame(df, plan=None):
+    """Apply the schema plan; returns (optimized frame, per-column savings report)"""
+    if plan is None:
+        plan = infer_schema(df)
+
+    before = df.memory_usage(deep=True, index=False)
+    optimized = df.copy(deep=False)
+
+    for col, kind in plan.items():
+        series = optimized[col]
+        if kind == 'category':
+            optimized[col] = series.astype('category')
+        elif kind == 'integer':
+            if pd.api.types.is_float_dtype(series):
+                series = series.astype('int64')
+            optimized[col] = _downcast_integers(series)
+        elif kind == 'datetime':
+            parsed = _try_parse_dates(series)
+            if parsed is not None:
+                optimized[col] = parsed
+            elif _is_low_cardinality(series):
+                # Named like a date but not one: still worth a categorical
+                optimized[col] = series.astype('category')
+
+    after = optimized.memory_usage(deep=True, index=False)
+
+    report = pd.DataFrame({
+        'column': [str(col) for col in df.columns],
+        'before_dtype': [str(df[col].dtype) for col in df.columns],
+        'after_dtype': [str(optimized[col].dtype) for col in df.columns],
+        'bytes_before': before.values,
+        'bytes_after': after.values,
+    })
+    report['bytes_saved'] = report['bytes_before'] - report['bytes_after']
+
+    return optimized, report
+
+
+def summarize_report(report):
+    """Totals for a savings report: bytes before/after and the reduction factor"""
+    before = int(report['bytes_before'].sum())
+    after = int(report['bytes_after'].sum())
+    return {
+        'bytes_before': before,
+        'bytes_after': after,
+        'bytes_saved': before - after,
+        'factor': before / after if after else None
+    }
@@ -0,0 +1,76 @@
+"""
+🧮 SHARED FEATURE MATRIX
+One contiguous float32 standardized matrix per dataset version and feature
+selection. K-Means, DBSCAN, the k sweep and PCA all read views of it
+instead of each rebuilding fillna(0).values and fitting its own scaler
+"""
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+# Rows standardized per block while filling the matrix
+BUILD_CHUNK_ROWS = 250_000
+
+
+class FeatureMatrix:
+    def __init__(self, X, features, mean, scale):
+        self.X = X
+        self.features = list(features)
+        self.mean_ = mean
+        self.scale_ = scale
+
+    @property
+    def n_rows(self):
+        return self.X.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.X.nbytes
+
+    def scaler(self):
+        """StandardScaler carrying the matrix's mean/scale, for transforming new rows"""
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean_.copy()
+        scaler.scale_ = self.scale_.copy()
+        scaler.var_ = self.scale_ ** 2
+        scaler.n_features_in_ = len(self.features)
+        scaler.n_samples_seen_ = self.n_rows
+        return scaler
+
+    def rows(self, start, stop):
+        """Zero-copy view of a row block"""
+        return self.X[start:stop]
+
+    def chunks(self, chunk_rows):
+        """Zero-copy views of consecutive row blocks"""
+        for start in range(0, self.n_rows, chunk_rows):
+            yield self.X[start:start + chunk_rows]
+
+
+def build_feature_matrix(df, features, chunk_rows=BUILD_CHUNK_ROWS):
+    """Standardize df[features] (NaN -> 0) into a read-only C-contiguous float32 matrix
+
+    Column statistics come from one float64 pass per column; the matrix is
+    then filled block by block, so no full float64 copy ever exists. The
+    float32 matrix itself (rows x features x 4 bytes) is always held whole.
+    Constant columns get scale 1, as StandardScaler does.
+    """
+    n_rows, n_features = len(df), len(features)
+    mean = np.empty(n_features)
+    scale = np.empty(n_features)
+    for j, col in enumerate(features):
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        values = np.nan_to_num(values, nan=0.0)
+        mean[j] = values.mean() if n_rows else 0.0
+        std = values.std() if n_rows else 0.0
+        scale[j] = std if std > 0 else 1.0
+
+    X = np.empty((n_rows, n_features), dtype=np.float32, order='C')
+    for start in range(0, n_rows, chunk_rows):
+        # Rows first: df[features] would copy every selected column per block
+        block = df.iloc[start:start + chunk_rows][features].fillna(0).to_numpy(dtype='float64')
+        X[start:start + len(block)] = (block - mean) / scale
+
+    # Shared across sessions and threads
+    X.flags.writeable = False
+    return FeatureMatrix(X, features, mean, scale)
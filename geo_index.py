@@ -0,0 +1,284 @@
+"""
+🗺️ GEO INDEX
+Offline coordinate lookup for the dashboards. Centroids of all 36 states
+and union territories are bundled (with the spellings UIDAI drops use);
+district and pincode gazetteers are read from CSVs under data/geo when
+present. Names are normalized once per unique value and joined onto
+aggregated frames with vectorized index lookups
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_GEO_DIR = os.path.join("data", "geo")
+DISTRICT_FILE = "districts.csv"
+PINCODE_FILE = "pincodes.csv"
+STATE_GEOJSON_FILE = "india_states.geojson"
+
+# Approximate geographic centres (lat, lon) of the 28 states and 8 union territories
+STATE_CENTROIDS = {
+    'Andhra Pradesh': (15.9129, 79.7400),
+    'Arunachal Pradesh': (28.2180, 94.7278),
+    'Assam': (26.2006, 92.9376),
+    'Bihar': (25.0961, 85.3131),
+    'Chhattisgarh': (21.2787, 81.8661),
+    'Goa': (15.2993, 74.1240),
+    'Gujarat': (22.2587, 71.1924),
+    'Haryana': (29.0588, 76.0856),
+    'Himachal Pradesh': (31.1048, 77.1734),
+    'Jharkhand': (23.6102, 85.2799),
+    'Karnataka': (15.3173, 75.7139),
+    'Kerala': (10.8505, 76.2711),
+    'Madhya Pradesh': (22.9734, 78.6569),
+    'Maharashtra': (19.7515, 75.7139),
+    'Manipur': (24.6637, 93.9063),
+    'Meghalaya': (25.4670, 91.3662),
+    'Mizoram': (23.1645, 92.9376),
+    'Nagaland': (26.1584, 94.5624),
+    'Odisha': (20.9517, 85.0985),
+    'Punjab': (31.1471, 75.3412),
+    'Rajasthan': (27.0238, 74.2179),
+    'Sikkim': (27.5330, 88.5122),
+    'Tamil Nadu': (11.1271, 78.6569),
+    'Telangana': (18.1124, 79.0193),
+    'Tripura': (23.9408, 91.9882),
+    'Uttar Pradesh': (26.8467, 80.9462),
+    'Uttarakhand': (30.0668, 79.0193),
+    'West Bengal': (22.9868, 87.8550),
+    'Andaman and Nicobar Islands': (11.7401, 92.6586),
+    'Chandigarh': (30.7333, 76.7794),
+    'Dadra and Nagar Haveli and Daman and Diu': (20.3974, 72.8328),
+    'Delhi': (28.7041, 77.1025),
+    'Jammu and Kashmir': (33.2778, 75.3412),
+    'Ladakh': (34.2996, 78.2932),
+    'Lakshadweep': (10.5667, 72.6417),
+    'Puducherry': (11.9416, 79.8083),
+}
+
+# Old names, abbreviations and common misspellings -> canonical state / UT
+STATE_ALIASES = {
+    'Orissa': 'Odisha',
+    'Pondicherry': 'Puducherry',
+    'Uttaranchal': 'Uttarakhand',
+    'NCT of Delhi': 'Delhi',
+    'National Capital Territory of Delhi': 'Delhi',
+    'New Delhi': 'Delhi',
+    'Delhi NCT': 'Delhi',
+    'Chhatisgarh': 'Chhattisgarh',
+    'Chattisgarh': 'Chhattisgarh',
+    'Tamilnadu': 'Tamil Nadu',
+    'Telengana': 'Telangana',
+    'Westbengal': 'West Bengal',
+    'West Bangal': 'West Bengal',
+    'Andaman Nicobar Islands': 'Andaman and Nicobar Islands',
+    'Andaman and Nicobar': 'Andaman and Nicobar Islands',
+    'A and N Islands': 'Andaman and Nicobar Islands',
+    'Dadra and Nagar Haveli': 'Dadra and Nagar Haveli and Daman and Diu',
+    'Dadra Nagar Haveli': 'Dadra and Nagar Haveli and Daman and Diu',
+    'Daman and Diu': 'Dadra and Nagar Haveli and Daman and Diu',
+    'The Dadra and Nagar Haveli and Daman and Diu': 'Dadra and Nagar Haveli and Daman and Diu',
+    'Jammu Kashmir': 'Jammu and Kashmir',
+    'J and K': 'Jammu and Kashmir',
+}
+
+# Gazetteer column spellings (India Post / LGD exports) -> ours
+GAZETTEER_COLUMNS = {
+    'statename': 'state', 'state_name': 'state',
+    'districtname': 'district', 'district_name': 'district',
+    'latitude': 'lat', 'longitude': 'lon', 'lng': 'lon', 'long': 'lon',
+}
+
+# Gazetteer rows outside this box (lat, lon) are data errors and ignored
+INDIA_BOUNDS = ((6.0, 38.0), (68.0, 98.0))
+
+# geo_source values: placed from the gazetteer / at the bundled state centroid,
+# district of a known state without a gazetteer entry, unknown state
+SOURCE_DISTRICT = 'district'
+SOURCE_STATE = 'state'
+SOURCE_UNPLACED = 'unplaced'
+SOURCE_UNMATCHED = 'unmatched'
+
+# Properties that carry the state name in common India state GeoJSON files
+GEOJSON_NAME_PROPERTIES = ['ST_NM', 'st_nm', 'NAME_1', 'State_Name', 'state', 'name']
+
+
+def normalize_name(name):
+    """Comparison key for a place name: case, '&', punctuation and spacing ignored"""
+    text = str(name).lower().replace('&', ' and ')
+    text = re.sub(r'[^a-z0-9]+', ' ', text).strip()
+    return re.sub(r'^the ', '', text)
+
+
+def _factorize_names(values):
+    """(codes, normalized unique keys) so each distinct name is normalized once"""
+    codes, uniques = pd.factorize(pd.Series(values), sort=False)
+    return codes, pd.Index([normalize_name(value) for value in uniques])
+
+
+def _take(values, codes, fill):
+    """values[codes] with fill where codes are -1"""
+    return np.append(np.asarray(values, dtype=object), fill)[codes]
+
+
+def geo_signature(geo_dir=DEFAULT_GEO_DIR):
+    """(file, size, mtime) of the gazetteer files, to reload the index when they change"""
+    signature = []
+    for name in (DISTRICT_FILE, PINCODE_FILE, STATE_GEOJSON_FILE):
+        path = os.path.join(geo_dir, name)
+        if os.path.exists(path):
+            info = os.stat(path)
+            signature.append((name, info.st_size, info.st_mtime_ns))
+    return tuple(signature)
+
+
+class GeoIndex:
+    def __init__(self, districts=None, state_geojson=None, district_sources=()):
+        # Every canonical name and alias, keyed by its normalized form
+        names = {normalize_name(state): state for state in STATE_CENTROIDS}
+        names.update({normalize_name(alias): state for alias, state in STATE_ALIASES.items()})
+        self.states = pd.DataFrame({
+            'state': list(names.values()),
+            'lat': [STATE_CENTROIDS[state][0] for state in names.values()],
+            'lon': [STATE_CENTROIDS[state][1] for state in names.values()],
+        }, index=pd.Index(list(names), name='key'))
+
+        # (canonical state, normalized district) -> district, lat, lon
+        if districts is None:
+            districts = pd.DataFrame(columns=['district', 'lat', 'lon'],
+                                     index=pd.MultiIndex.from_arrays([[], []], names=['state', 'key']))
+        self.districts = districts
+        self.district_sources = list(district_sources)
+        self.state_geojson = state_geojson
+
+    @property
+    def n_districts(self):
+        return len(self.districts)
+
+    @classmethod
+    def load(cls, geo_dir=DEFAULT_GEO_DIR):
+        """Bundled state centroids plus whichever gazetteer files exist in geo_dir
+
+        districts.csv (state, district, lat, lon) wins over district centroids
+        derived from pincodes.csv (the median of each district's pincodes).
+        """
+        index = cls()
+        frames = []
+        sources = []
+        for name in (DISTRICT_FILE, PINCODE_FILE):
+            path = os.path.join(geo_dir, name)
+            if os.path.exists(path):
+                frames.append(index.read_gazetteer(path))
+                sources.append(name)
+
+        districts = None
+        if frames:
+            districts = pd.concat(frames)
+            districts = districts[~districts.index.duplicated(keep='first')].sort_index()
+
+        geojson = None
+        geojson_path = os.path.join(geo_dir, STATE_GEOJSON_FILE)
+        if os.path.exists(geojson_path):
+            with open(geojson_path) as f:
+                geojson = index.label_geojson(json.load(f))
+
+        return cls(districts, geojson, sources)
+
+    def _state_positions(self, states):
+        """Row of self.states per value (-1 when unknown)"""
+        codes, keys = _factorize_names(states)
+        return np.append(self.states.index.get_indexer(keys), -1)[codes]
+
+    def canonical_states(self, states):
+        """Canonical state / UT name per value (None when unknown)"""
+        return _take(self.states['state'].to_numpy(), self._state_positions(states), None)
+
+    def read_gazetteer(self, path):
+        """District centroids from a district or pincode gazetteer CSV"""
+        table = pd.read_csv(path, dtype=str)
+        table.columns = [GAZETTEER_COLUMNS.get(col.strip().lower(), col.strip().lower())
+                         for col in table.columns]
+        missing = [col for col in ('state', 'district', 'lat', 'lon') if col not in table.columns]
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+
+        table['lat'] = pd.to_numeric(table['lat'], errors='coerce')
+        table['lon'] = pd.to_numeric(table['lon'], errors='coerce')
+        (lat_min, lat_max), (lon_min, lon_max) = INDIA_BOUNDS
+        table = table[table['lat'].between(lat_min, lat_max) & table['lon'].between(lon_min, lon_max)]
+
+        # Rows whose state is not recognised cannot be joined and are dropped
+        table = table.assign(state=self.canonical_states(table['state']))
+        table = table.dropna(subset=['state', 'district'])
+        codes, keys = _factorize_names(table['district'])
+        table = table.assign(key=keys[codes])
+
+        return table.groupby(['state', 'key']).agg(
+            district=('district', 'first'), lat=('lat', 'median'), lon=('lon', 'median')
+        )
+
+    def label_geojson(self, geojson):
+        """Keep features whose name resolves to a state and set their id to the canonical name"""
+        features = []
+        for feature in geojson.get('features', []):
+            properties = feature.get('properties') or {}
+            name = next((properties[key] for key in GEOJSON_NAME_PROPERTIES if properties.get(key)), None)
+            state = None if name is None else self.canonical_states([name])[0]
+            if state is not None:
+                features.append(dict(feature, id=state))
+        return {'type': 'FeatureCollection', 'features': features}
+
+    def locate_states(self, states):
+        """Canonical name, centroid and geo_source per state value
+
+        Unknown names get NaN coordinates and geo_source 'unmatched' rather
+        than a made-up position.
+        """
+        positions = self._state_positions(states)
+        return pd.DataFrame({
+            'state_name': _take(self.states['state'].to_numpy(), positions, None),
+            'lat': np.append(self.states['lat'].to_numpy(), np.nan)[positions],
+            'lon': np.append(self.states['lon'].to_numpy(), np.nan)[positions],
+            'geo_source': np.where(positions >= 0, SOURCE_STATE, SOURCE_UNMATCHED),
+        })
+
+    def locate_districts(self, states, districts):
+        """Coordinates per (state, district) pair
+
+        Gazetteer hits use the district centroid ('district'). Districts
+        the gazetteer lacks get NaN coordinates and 'unplaced', and pairs
+        whose state is unknown are 'unmatched'; neither is given a made-up
+        position.
+        """
+        located = self.locate_states(states)
+        codes, keys = _factorize_names(districts)
+        state_name = located['state_name'].fillna('').to_numpy(dtype=object)
+
+        # Work on distinct pairs only; rows take their pair's answer
+        pair_codes, pairs = pd.MultiIndex.from_arrays([state_name, _take(keys, codes, '')]).factorize()
+        known_state = pairs.get_level_values(0).to_numpy(dtype=object) != ''
+        positions = self.districts.index.get_indexer(pairs)
+        hit = known_state & (positions >= 0)
+
+        district_lat = np.append(self.districts['lat'].to_numpy(dtype='float64'), np.nan)
+        district_lon = np.append(self.districts['lon'].to_numpy(dtype='float64'), np.nan)
+        lat = np.where(hit, district_lat[positions], np.nan)
+        lon = np.where(hit, district_lon[positions], np.nan)
+        source = np.where(hit, SOURCE_DISTRICT, np.where(known_state, SOURCE_UNPLACED, SOURCE_UNMATCHED))
+
+        located['lat'] = lat[pair_codes]
+        located['lon'] = lon[pair_codes]
+        located['geo_source'] = source[pair_codes]
+        return located
+
+    def attach(self, frame, level='state'):
+        """Copy of an aggregated frame with state_name, lat, lon and geo_source columns"""
+        if level == 'district':
+            located = self.locate_districts(frame['state'], frame['district'])
+        else:
+            located = self.locate_states(frame['state'])
+        located.index = frame.index
+        return pd.concat([frame, located], axis=1)
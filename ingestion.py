@@ -0,0 +1,549 @@
+"""
+📥 UIDAI INGESTION ENGINE
+Streams the api_data_aadhar_* CSV drops in bounded chunks and reduces them
+into state × district × date aggregates for the dashboard, sketching the
+distribution of the raw per-record counts on the way
+"""
+
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+
+from anomaly_engine import detect_anomalies
+from quantile_sketch import FrameSketch
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+try:
+    import pyarrow  # noqa: F401 - parquet engine for the file cache
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Dataset name -> folder under data/raw/
+UIDAI_FOLDERS = {
+    "Enrollment": "api_data_aadhar_enrolment",
+    "Demographic": "api_data_aadhar_demographic",
+    "Biometric": "api_data_aadhar_biometric",
+}
+
+# Grain the dashboard works at; pincode is reduced away
+KEY_COLUMNS = ['state', 'district', 'date']
+DROP_COLUMNS = ['pincode']
+
+DEFAULT_CHUNKSIZE = 250_000
+# Re-reduce partial aggregates once they hold this many rows
+COMBINE_THRESHOLD = 1_000_000
+
+MANIFEST_FILE = "manifest.json"
+
+
+def list_folder_files(base_path, folder):
+    """List every CSV in a UIDAI folder in a stable order"""
+    return sorted(glob.glob(os.path.join(base_path, folder, "*.csv")))
+
+
+def normalize_column(name):
+    """Normalize a CSV header to the lower_snake form used internally"""
+    return str(name).strip().lower().replace(' ', '_')
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process or any parser worker in MB (None if unavailable)"""
+    if not HAS_RESOURCE:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def default_cache_dir(base_path):
+    """Parquet cache lives next to data/raw/ as data/cache/"""
+    return os.path.join(os.path.dirname(os.path.normpath(base_path)), "cache")
+
+
+def file_fingerprint(path):
+    """Identity of a CSV on disk: size and modification time"""
+    info = os.stat(path)
+    return {'size': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+
+def load_manifest(cache_dir):
+    """Read the cache manifest (path -> fingerprint, parquet file, rows)"""
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # A corrupt manifest only costs a re-parse
+        return {}
+
+
+def save_manifest(cache_dir, manifest):
+    """Write the manifest atomically so a crash never leaves it half-written"""
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def cache_file_for(cache_dir, path):
+    """Stable parquet file name for a source CSV"""
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    folder = os.path.basename(os.path.dirname(path))
+    return os.path.join(cache_dir, folder, f"{digest}.parquet")
+
+
+def read_cached_partial(entry):
+    """Load a cached per-file aggregate back into its indexed form"""
+    return pd.read_parquet(entry['parquet']).set_index(KEY_COLUMNS)
+
+
+def write_cached_partial(cache_dir, path, partial, rows, sketch):
+    """Persist a per-file aggregate and its raw-value sketch; return the manifest entry
+
+    Both files are written under temporary names and renamed into place, so
+    concurrent readers and the manifest never see a half-written file.
+    """
+    parquet_path = cache_file_for(cache_dir, path)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    sketch_path = os.path.splitext(parquet_path)[0] + ".sketch.joblib"
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+    partial.reset_index().to_parquet(parquet_path + suffix, index=False)
+    os.replace(parquet_path + suffix, parquet_path)
+    joblib.dump(sketch, sketch_path + suffix)
+    os.replace(sketch_path + suffix, sketch_path)
+
+    entry = file_fingerprint(path)
+    entry.update({'parquet': parquet_path, 'sketch': sketch_path, 'rows': rows})
+    return entry
+
+
+def lookup_cached_partial(path, manifest):
+    """Return (partial, rows, sketch) from the parquet cache if size and mtime match"""
+    entry = manifest.get(os.path.abspath(path))
+    # Entries written before sketches existed are re-parsed once
+    if not entry or not os.path.exists(entry['parquet']) or not os.path.exists(entry.get('sketch', '')):
+        return None
+
+    fingerprint = file_fingerprint(path)
+    if entry['size'] != fingerprint['size'] or entry['mtime_ns'] != fingerprint['mtime_ns']:
+        return None
+
+    try:
+        return read_cached_partial(entry), entry['rows'], joblib.load(entry['sketch'])
+    except Exception:
+        # Unreadable cache file: the caller re-parses the CSV
+        return None
+
+
+def prune_manifest(manifest, live_paths):
+    """Drop cache entries (and parquet files) for CSVs that no longer exist"""
+    live = {os.path.abspath(p) for p in live_paths}
+    for key in [k for k in manifest if k not in live]:
+        entry = manifest.pop(key)
+        for cached in (entry['parquet'], entry.get('sketch')):
+            if cached and os.path.exists(cached):
+                os.remove(cached)
+
+
+def csv_read_plan(path):
+    """Work out which columns to read and their explicit dtypes"""
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    columns = {normalize_column(col): col for col in header}
+
+    if not all(key in columns for key in KEY_COLUMNS):
+        return None
+
+    count_cols = [col for col in columns if col not in KEY_COLUMNS + DROP_COLUMNS]
+    usecols = [columns[col] for col in KEY_COLUMNS + count_cols]
+
+    # Keys stay strings until the final reduce; counts may contain blanks
+    dtypes = {columns[col]: str for col in KEY_COLUMNS}
+    dtypes.update({columns[col]: 'float64' for col in count_cols})
+
+    return {
+        'usecols': usecols,
+        'dtype': dtypes,
+        'rename': {raw: col for col, raw in columns.items()},
+        'count_cols': count_cols
+    }
+
+
+def _combine(partials, count_cols):
+    """Reduce a list of partial aggregates into one"""
+    combined = pd.concat(partials)
+    return combined.groupby(level=list(range(len(KEY_COLUMNS))), sort=False)[count_cols].sum()
+
+
+def parse_dates(series):
+    """Parse UIDAI dd-mm-yyyy dates, falling back to a lenient parse"""
+    parsed = pd.to_datetime(series, format='%d-%m-%Y', errors='coerce')
+    if parsed.isna().mean() > 0.5:
+        parsed = pd.to_datetime(series, dayfirst=True, errors='coerce', format='mixed')
+    return parsed
+
+
+def aggregate_file(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream one CSV in chunks and reduce it to state/district/date sums
+
+    Every chunk's raw count columns also feed a FrameSketch, so the
+    per-record distribution is summarized without keeping the rows.
+    Returns (aggregate, rows, sketch).
+    """
+    plan = csv_read_plan(path)
+    if plan is None:
+        return None, 0, None
+
+    count_cols = plan['count_cols']
+    partials = []
+    partial_rows = 0
+    rows = 0
+    sketch = FrameSketch()
+
+    reader = pd.read_csv(path, usecols=plan['usecols'], dtype=plan['dtype'],
+                         chunksize=chunksize)
+    for chunk in reader:
+        chunk = chunk.rename(columns=plan['rename'])
+        rows += len(chunk)
+
+        for key in KEY_COLUMNS:
+            chunk[key] = chunk[key].str.strip()
+        # Blanks are missing values for the sketch, zeros for the sums
+        sketch.update(chunk, count_cols, chunk_rows=chunksize)
+        chunk[count_cols] = chunk[count_cols].fillna(0)
+
+        partial = chunk.groupby(KEY_COLUMNS, sort=False)[count_cols].sum()
+        partials.append(partial)
+        partial_rows += len(partial)
+
+        # Keep the working set bounded regardless of file size
+        if partial_rows > COMBINE_THRESHOLD:
+            partials = [_combine(partials, count_cols)]
+            partial_rows = len(partials[0])
+
+    if not partials:
+        return None, rows, None
+
+    return _combine(partials, count_cols), rows, sketch
+
+
+def finalize_aggregate(partials):
+    """Merge per-file aggregates, parse dates once and fix dtypes"""
+    partials = [p for p in partials if p is not None and len(p)]
+    if not partials:
+        return None
+
+    count_cols = list(dict.fromkeys(col for p in partials for col in p.columns))
+    merged = _combine([p.reindex(columns=count_cols, fill_value=0) for p in partials], count_cols)
+    merged = merged.reset_index()
+
+    # Dates are parsed on the reduced frame, not on every raw row
+    merged['date'] = parse_dates(merged['date'])
+    merged = merged.dropna(subset=['date'])
+    merged = merged.groupby(KEY_COLUMNS, sort=True)[count_cols].sum().reset_index()
+    merged[count_cols] = merged[count_cols].round().astype('int64')
+
+    return merged
+
+
+def _aggregate_job(path, chunksize, cache_dir):
+    """Parse one CSV (runs in a worker process when the pool is enabled)"""
+    # Wall time including file I/O; CPU time alone would leave the reads out
+    start = time.perf_counter()
+    partial, rows, sketch = aggregate_file(path, chunksize)
+    entry = None
+    if partial is not None and cache_dir is not None:
+        entry = write_cached_partial(cache_dir, path, partial, rows, sketch)
+    return partial, rows, sketch, entry, time.perf_counter() - start
+
+
+def parse_files(paths, chunksize=DEFAULT_CHUNKSIZE, cache_dir=None, manifest=None, workers=1):
+    """Aggregate each CSV, serving cache hits and spreading misses over a pool
+
+    Returns {path: (partial, rows, cache_hit, parse_seconds, sketch)}.
+    """
+    results = {}
+    pending = []
+    for path in paths:
+        cached = lookup_cached_partial(path, manifest) if cache_dir is not None else None
+        if cached is not None:
+            results[path] = (cached[0], cached[1], True, 0.0, cached[2])
+        else:
+            pending.append(path)
+
+    parsed = {}
+    if workers > 1 and len(pending) > 1:
+        # Spawned workers never inherit the Streamlit server's threads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context) as pool:
+            futures = {path: pool.submit(_aggregate_job, path, chunksize, cache_dir) for path in pending}
+            for path, future in futures.items():
+                parsed[path] = future.result()
+    else:
+        for path in pending:
+            parsed[path] = _aggregate_job(path, chunksize, cache_dir)
+
+    for path, (partial, rows, sketch, entry, seconds) in parsed.items():
+        if entry is not None:
+            manifest[os.path.abspath(path)] = entry
+        results[path] = (partial, rows, False, seconds, sketch)
+
+    return results
+
+
+def snapshot_sources(base_path):
+    """Fingerprint every CSV currently in the three UIDAI folders"""
+    return {os.path.abspath(path): file_fingerprint(path)
+            for folder in UIDAI_FOLDERS.values()
+            for path in list_folder_files(base_path, folder)}
+
+
+def diff_sources(previous, current):
+    """Split current files into added / changed / removed relative to previous"""
+    added = sorted(p for p in current if p not in previous)
+    changed = sorted(p for p in current if p in previous and current[p] != previous[p])
+    removed = sorted(p for p in previous if p not in current)
+    return added, changed, removed
+
+
+def _ingest(base_path, folder_files, chunksize, use_cache, workers):
+    """Parse the given files per folder; returns ({name: aggregate}, stats)"""
+    start = time.perf_counter()
+    aggregates = {}
+    folder_stats = {}
+    sketches = {}
+
+    cache_dir = default_cache_dir(base_path) if use_cache and HAS_PYARROW else None
+    manifest = load_manifest(cache_dir) if cache_dir is not None else None
+
+    all_paths = [path for paths in folder_files.values() for path in paths]
+    sources = {os.path.abspath(path): file_fingerprint(path) for path in all_paths}
+
+    parse_start = time.perf_counter()
+    results = parse_files(all_paths, chunksize, cache_dir, manifest, workers)
+    parse_wall = time.perf_counter() - parse_start
+
+    for name, folder in UIDAI_FOLDERS.items():
+        files = folder_files.get(name, [])
+        partials = [results[path][0] for path in files if results[path][0] is not None]
+        aggregate = finalize_aggregate(partials)
+
+        folder_stats[name] = {
+            'folder': folder,
+            'files': len(files),
+            'skipped': [os.path.basename(p) for p in files if results[p][0] is None],
+            'cache_hits': sum(results[p][2] for p in files),
+            'rows': sum(results[p][1] for p in files),
+            'aggregated_rows': 0 if aggregate is None else len(aggregate),
+            'parse_seconds': sum(results[p][3] for p in files)
+        }
+        if aggregate is not None:
+            aggregates[name] = aggregate
+
+        # Per-file sketches merge in path order into one per folder
+        file_sketches = [results[p][4] for p in files if results[p][4] is not None]
+        if file_sketches:
+            sketches[name] = FrameSketch()
+            for sketch in file_sketches:
+                sketches[name].merge(sketch)
+
+    if cache_dir is not None:
+        prune_manifest(manifest, snapshot_sources(base_path))
+        save_manifest(cache_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    rows = sum(s['rows'] for s in folder_stats.values())
+    # No serial run is timed: the per-file parse times summed are only an
+    # estimate of it (contending workers inflate them)
+    serial_seconds = sum(s['parse_seconds'] for s in folder_stats.values())
+
+    stats = {
+        'rows': rows,
+        'files': len(all_paths),
+        'cache_hits': sum(s['cache_hits'] for s in folder_stats.values()),
+        'workers': workers,
+        'elapsed': elapsed,
+        'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+        'serial_seconds': serial_seconds,
+        'parse_seconds': parse_wall,
+        'estimated_speedup': serial_seconds / parse_wall if serial_seconds > 0 and parse_wall > 0 else None,
+        'peak_memory_mb': peak_memory_mb(),
+        'folders': folder_stats,
+        'sketches': sketches,
+        'sources': sources
+    }
+    return aggregates, stats
+
+
+def load_uidai_folders(base_path="data/raw/", chunksize=DEFAULT_CHUNKSIZE, use_cache=True, workers=1):
+    """Stream all three UIDAI folders; returns [(name, frame)] and run stats
+
+    With workers > 1 files are parsed across a process pool. Partials are
+    merged in sorted path order and reduced by key, so the result does not
+    depend on which worker finished first.
+    """
+    folder_files = {name: list_folder_files(base_path, folder) for name, folder in UIDAI_FOLDERS.items()}
+    aggregates, stats = _ingest(base_path, folder_files, chunksize, use_cache, workers)
+    stats['mode'] = 'full'
+    return list(aggregates.items()), stats
+
+
+def merge_aggregates(existing, addition):
+    """Fold a new state/district/date aggregate into an existing one"""
+    frames = []
+    for frame in (existing, addition):
+        if frame is None:
+            continue
+        frame = frame.copy()
+        # Loaded frames may carry categorical keys with different categories
+        for key in ['state', 'district']:
+            frame[key] = frame[key].astype(str)
+        frames.append(frame.set_index(KEY_COLUMNS))
+
+    count_cols = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    merged = pd.concat([frame.reindex(columns=count_cols, fill_value=0) for frame in frames])
+    merged = merged.groupby(level=list(range(len(KEY_COLUMNS))), sort=True).sum().reset_index()
+    merged[count_cols] = merged[count_cols].astype('int64')
+    return merged
+
+
+def load_uidai_incremental(previous_frames, previous_sources, base_path="data/raw/",
+                           chunksize=DEFAULT_CHUNKSIZE, use_cache=True, workers=1, previous_sketches=None):
+    """Fold only newly added CSVs into previously loaded aggregates
+
+    Cost is proportional to the new files plus the (already reduced)
+    aggregates; the new files' sketches are merged into previous_sketches.
+    If an existing file changed or disappeared its old contribution cannot
+    be subtracted, so the loader falls back to a full reload and says why
+    in stats['reason'].
+    """
+    current = snapshot_sources(base_path)
+    added, changed, removed = diff_sources(previous_sources or {}, current)
+
+    reason = None
+    if not previous_frames:
+        reason = "nothing loaded yet"
+    elif changed or removed:
+        reason = f"{len(changed)} changed and {len(removed)} removed files"
+    if reason is not None:
+        all_data, stats = load_uidai_folders(base_path, chunksize, use_cache, workers)
+        stats['reason'] = reason
+        return all_data, stats
+
+    added_set = set(added)
+    folder_files = {
+        name: [p for p in list_folder_files(base_path, folder) if os.path.abspath(p) in added_set]
+        for name, folder in UIDAI_FOLDERS.items()
+    }
+    additions, stats = _ingest(base_path, folder_files, chunksize, use_cache, workers)
+
+    all_data = []
+    for name in UIDAI_FOLDERS:
+        existing = previous_frames.get(name)
+        addition = additions.get(name)
+        if addition is None:
+            merged = existing
+        else:
+            merged = merge_aggregates(existing, addition)
+        if merged is not None:
+            all_data.append((name, merged))
+
+    sketches = {}
+    for name in UIDAI_FOLDERS:
+        parts = [sketch for sketch in ((previous_sketches or {}).get(name), stats['sketches'].get(name))
+                 if sketch is not None]
+        if parts:
+            sketches[name] = FrameSketch()
+            for sketch in parts:
+                sketches[name].merge(sketch)
+    stats['sketches'] = sketches
+
+    stats['mode'] = 'incremental'
+    stats['new_files'] = len(added)
+    stats['sources'] = current
+    return all_data, stats
+
+
+# ========== DASHBOARD SCHEMA ==========
+
+# Representative ages for the enrolment age buckets (used for avg_age)
+AGE_BUCKET_MIDPOINTS = {'age_0_5': 2.5, 'age_5_17': 11.0, 'age_18_greater': 35.0}
+
+
+def _bucket_total(frame, prefix, name):
+    """Sum all count columns with a given prefix into a single measure"""
+    cols = [col for col in frame.columns if col.startswith(prefix)]
+    totals = frame[KEY_COLUMNS].copy()
+    totals[name] = frame[cols].sum(axis=1) if cols else 0
+    return totals, cols
+
+
+def build_standard_frame(all_data):
+    """Normalize loaded UIDAI aggregates into the schema run_standard_mode uses
+
+    The UIDAI drops count generated Aadhaar, so every enrolment counts as
+    successful. Measures the drops do not carry (gender_ratio,
+    digital_literacy, population_density) are left as NaN rather than
+    invented. is_anomaly / anomaly_score come from the anomaly engine's
+    seasonal robust z-scores.
+    """
+    frames = dict(all_data)
+    if "Enrollment" not in frames:
+        return None
+
+    enrolment = frames["Enrollment"]
+    standard, age_cols = _bucket_total(enrolment, 'age_', 'enrolments')
+    for col in age_cols:
+        standard[col] = enrolment[col].values
+
+    for name, prefix, measure in [("Demographic", 'demo_', 'demographic_updates'),
+                                  ("Biometric", 'bio_', 'biometric_updates')]:
+        if name in frames:
+            totals, _ = _bucket_total(frames[name], prefix, measure)
+            standard = standard.merge(totals, on=KEY_COLUMNS, how='left')
+            standard[measure] = standard[measure].fillna(0).astype('int64')
+
+    known_ages = [col for col in age_cols if col in AGE_BUCKET_MIDPOINTS]
+    if known_ages:
+        weighted = sum(standard[col] * AGE_BUCKET_MIDPOINTS[col] for col in known_ages)
+        counted = standard[known_ages].sum(axis=1)
+        standard['avg_age'] = (weighted / counted.where(counted > 0)).astype('float64')
+    else:
+        standard['avg_age'] = float('nan')
+
+    standard['successful_enrolments'] = standard['enrolments']
+    standard['pending_enrolments'] = 0
+    standard['success_rate'] = 1.0
+    standard['gender_ratio'] = float('nan')
+    standard['digital_literacy'] = float('nan')
+    standard['population_density'] = float('nan')
+    scores = detect_anomalies(standard)
+    standard['is_anomaly'] = scores['is_anomaly']
+    standard['anomaly_score'] = scores['anomaly_score']
+    standard['year_month'] = standard['date'].dt.strftime('%Y-%m')
+    standard['month'] = standard['date'].dt.month
+    standard['quarter'] = standard['date'].dt.quarter
+
+    return standard.reset_index(drop=True)
@@ -0,0 +1,132 @@
+"""
+⏳ BACKGROUND JOB RUNNER
+Runs heavy analyses on a worker thread pool outside the Streamlit script
+thread, so they survive reruns. Jobs report progress and can be cancelled
+cooperatively; the page polls them by id
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once cancellation has been requested"""
+
+
+class Job:
+    def __init__(self, job_id, label):
+        self.id = job_id
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    def update(self, progress=None, message=None):
+        """Report progress (0..1); raises JobCancelled if the job was cancelled"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        if progress is not None:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        """Ask the job to stop at its next progress update"""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self._finish(CANCELLED)
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def elapsed(self):
+        """Seconds spent running so far (or in total once finished)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.monotonic()
+        if status == DONE:
+            self.progress = 1.0
+            self.message = "Finished"
+        elif status == CANCELLED:
+            self.message = "Cancelled"
+
+
+class JobRunner:
+    def __init__(self, max_workers=2, keep_finished=32):
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='analysis-job')
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        job.started_at = time.monotonic()
+        job.message = "Running"
+        try:
+            job.update()
+            result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            job._finish(CANCELLED)
+        except Exception as e:
+            job._finish(FAILED, error=str(e))
+        else:
+            job._finish(DONE, result=result)
+
+    def submit(self, label, fn, *args, **kwargs):
+        """Queue fn(job, *args, **kwargs) and return its Job"""
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", label)
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        """Job by id, or None if unknown or already pruned"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def active(self):
+        """Jobs still queued or running"""
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done()]
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond keep_finished"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done()]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,183 @@
+"""
+🧊 OLAP CUBE
+Array-backed location × month cube over the standard-mode measures. Every
+roll-up the dashboards use is precomputed once per dataset version, so
+views answer in time proportional to the number of groups, not raw rows
+"""
+
+import numpy as np
+import pandas as pd
+
+# Measures carried by the cube when present in the frame
+CUBE_MEASURES = ['enrolments', 'successful_enrolments', 'success_rate',
+                 'digital_literacy', 'is_anomaly', 'anomaly_score']
+
+# Dimensions with precomputed roll-ups
+ROLLUP_DIMENSIONS = ['state', 'district', 'date', 'quarter', ('state', 'quarter'), ('state', 'district')]
+
+
+def _codes(series):
+    """Integer codes and labels for a column (categoricals reuse their codes)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        codes = series.cat.codes.to_numpy()
+        used = np.unique(codes[codes >= 0])
+        remap = np.full(len(categories), -1, dtype=np.int64)
+        remap[used] = np.arange(len(used))
+        return remap[codes], pd.Index(categories[used])
+    codes, labels = pd.factorize(series, sort=True)
+    return codes, pd.Index(labels)
+
+
+class OlapCube:
+    def __init__(self, df, measures=None):
+        measures = measures or CUBE_MEASURES
+        self.measures = [m for m in measures if m in df.columns]
+
+        # Derived measures so anomaly KPIs need no row scan either
+        values = {m: df[m].to_numpy(dtype='float64', na_value=np.nan) for m in self.measures}
+        if 'is_anomaly' in values:
+            flagged = np.nan_to_num(values['is_anomaly'])
+            if 'enrolments' in values:
+                values['anomaly_enrolments'] = values['enrolments'] * flagged
+            if 'anomaly_score' in values:
+                values['flagged_anomaly_score'] = values['anomaly_score'] * flagged
+        self.columns = list(values)
+
+        # Axes: (state, district) location × calendar month
+        state_codes, self.states = _codes(df['state'])
+        district_codes, self.districts = _codes(df['district'])
+        months = pd.to_datetime(df['date']).dt.to_period('M')
+        period_codes, periods = pd.factorize(months, sort=True)
+        self.periods = periods.to_timestamp()
+
+        location = state_codes.astype(np.int64) * len(self.districts) + district_codes
+        location_codes, locations = pd.factorize(location, sort=True)
+        self.location_state = (locations // len(self.districts)).astype(np.int64)
+        self.location_district = (locations % len(self.districts)).astype(np.int64)
+
+        n_locations, n_periods = len(locations), len(self.periods)
+        cell = location_codes.astype(np.int64) * n_periods + period_codes
+        n_cells = n_locations * n_periods
+
+        # sums / non-null counts per measure, row counts per cell
+        shape = (n_locations, n_periods, len(self.columns))
+        self.sums = np.zeros(shape)
+        self.counts = np.zeros(shape)
+        for i, col in enumerate(self.columns):
+            data = values[col]
+            valid = ~np.isnan(data)
+            self.sums[:, :, i] = np.bincount(cell[valid], weights=data[valid],
+                                             minlength=n_cells).reshape(n_locations, n_periods)
+            self.counts[:, :, i] = np.bincount(cell[valid], minlength=n_cells).reshape(n_locations, n_periods)
+        self.rows = np.bincount(cell, minlength=n_cells).reshape(n_locations, n_periods)
+
+        self._rollups = {dim: self._build_rollup(dim) for dim in ROLLUP_DIMENSIONS}
+        self._totals = (self.sums.sum(axis=(0, 1)), self.counts.sum(axis=(0, 1)))
+
+    def _group(self, codes, n_groups, axis_sums, axis_counts):
+        """Sum location- or period-level arrays into n_groups buckets"""
+        sums = np.zeros((n_groups, len(self.columns)))
+        counts = np.zeros((n_groups, len(self.columns)))
+        np.add.at(sums, codes, axis_sums)
+        np.add.at(counts, codes, axis_counts)
+        return sums, counts
+
+    def _build_rollup(self, dim):
+        """Precompute sums and non-null counts for one dimension"""
+        quarters = ((self.periods.month - 1) // 3 + 1).to_numpy()
+        quarter_labels, quarter_codes = np.unique(quarters, return_inverse=True)
+
+        if dim == 'state':
+            sums, counts = self._group(self.location_state, len(self.states),
+                                       self.sums.sum(axis=1), self.counts.sum(axis=1))
+            return pd.DataFrame({'state': self.states}), sums, counts
+        if dim == 'district':
+            sums, counts = self._group(self.location_district, len(self.districts),
+                                       self.sums.sum(axis=1), self.counts.sum(axis=1))
+            return pd.DataFrame({'district': self.districts}), sums, counts
+        if dim == 'date':
+            return pd.DataFrame({'date': self.periods}), self.sums.sum(axis=0), self.counts.sum(axis=0)
+        if dim == 'quarter':
+            sums, counts = self._group(quarter_codes, len(quarter_labels),
+                                       self.sums.sum(axis=0), self.counts.sum(axis=0))
+            return pd.DataFrame({'quarter': quarter_labels}), sums, counts
+        if dim == ('state', 'district'):
+            # One row per location, so same-named districts of different states stay apart
+            labels = pd.DataFrame({
+                'state': self.states[self.location_state],
+                'district': self.districts[self.location_district]
+            })
+            return labels, self.sums.sum(axis=1), self.counts.sum(axis=1)
+        if dim == ('state', 'quarter'):
+            # state × period first, then fold periods into quarters
+            n_states, n_quarters = len(self.states), len(quarter_labels)
+            state_period_sums = np.zeros((n_states, len(self.periods), len(self.columns)))
+            state_period_counts = np.zeros_like(state_period_sums)
+            np.add.at(state_period_sums, self.location_state, self.sums)
+            np.add.at(state_period_counts, self.location_state, self.counts)
+            sums = np.zeros((n_states, n_quarters, len(self.columns)))
+            counts = np.zeros_like(sums)
+            np.add.at(sums, (slice(None), quarter_codes), state_period_sums)
+            np.add.at(counts, (slice(None), quarter_codes), state_period_counts)
+            labels = pd.DataFrame({
+                'state': np.repeat(self.states, n_quarters),
+                'quarter': np.tile(quarter_labels, n_states)
+            })
+            return labels, sums.reshape(-1, len(self.columns)), counts.reshape(-1, len(self.columns))
+        raise ValueError(f"Unsupported cube dimension: {dim}")
+
+    def _value(self, sums, counts, measure, how):
+        i = self.columns.index(measure)
+        if how == 'sum':
+            return sums[..., i]
+        if how == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(counts[..., i] > 0, sums[..., i] / counts[..., i], np.nan)
+        raise ValueError(f"Unsupported aggregation: {how}")
+
+    def rollup(self, by, agg):
+        """Same shape as df.groupby(by).agg(agg).reset_index(), from precomputed arrays"""
+        labels, sums, counts = self._rollups[by]
+        result = labels.copy()
+        for measure, how in agg.items():
+            result[measure] = self._value(sums, counts, measure, how)
+        return result
+
+    def pivot(self, measure, index='state', columns='quarter', how='mean'):
+        """Same shape as df.pivot_table(...).fillna(0) for state × quarter"""
+        table = self.rollup((index, columns), {measure: how})
+        return table.pivot(index=index, columns=columns, values=measure).fillna(0)
+
+    def total(self, measure, how='sum'):
+        """Grand total (or mean) of one measure"""
+        return float(self._value(*self._totals, measure, how))
+
+    def kpis(self):
+        """Headline numbers for the KPI cards and anomaly summary"""
+        enrolments = self.total('enrolments')
+        successful = self.total('successful_enrolments')
+        kpis = {
+            'enrolments': enrolments,
+            'successful_enrolments': successful,
+            'success_rate': successful / enrolments if enrolments else 0.0,
+            'anomalies': 0,
+            'anomaly_states': 0,
+            'anomaly_severity': 0.0,
+            'anomaly_impact': 0.0
+        }
+        if 'is_anomaly' in self.columns:
+            anomalies = self.total('is_anomaly')
+            by_state = self.rollup('state', {'is_anomaly': 'sum'})
+            kpis['anomalies'] = int(anomalies)
+            kpis['anomaly_states'] = int((by_state['is_anomaly'] > 0).sum())
+            if anomalies:
+                if 'flagged_anomaly_score' in self.columns:
+                    kpis['anomaly_severity'] = self.total('flagged_anomaly_score') / anomalies
+                if 'anomaly_enrolments' in self.columns and enrolments:
+                    kpis['anomaly_impact'] = self.total('anomaly_enrolments') / enrolments
+        return kpis
+
+    def nbytes(self):
+        """Memory held by the cube arrays"""
+        return self.sums.nbytes + self.counts.nbytes + self.rows.nbytes
@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+
+from clustering_engine import profile_clusters
+
+
+def test_profile_clusters_with_is_anomaly_as_feature():
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0, 4.0], 'is_anomaly': [0, 1, 0, 0]})
+    clusters = np.array([0, 0, 1, -1])
+
+    profile = profile_clusters(df, clusters, ['a', 'is_anomaly'], n_clusters=2)
+
+    assert list(profile['anomaly_rate']) == [0.5, 0.0, 0.0]
+    assert list(profile['mean_is_anomaly']) == [0.5, 0.0, 0.0]
+    assert 'std_is_anomaly' in profile.columns
@@ -0,0 +1,17 @@
+import numpy as np
+
+from clustering_models import ClusteringModel, list_models, load_model
+
+
+def _model(name):
+    return ClusteringModel(name, ['a', 'b'], np.zeros(2), np.ones(2), np.eye(2))
+
+
+def test_names_that_sanitize_alike_do_not_overwrite(tmp_path):
+    model_dir = str(tmp_path)
+    _model("Q1 2025").save(model_dir)
+    _model("Q1/2025").save(model_dir)
+
+    assert sorted(model.name for model in list_models(model_dir)) == ["Q1 2025", "Q1/2025"]
+    assert load_model("Q1/2025", model_dir).name == "Q1/2025"
+    assert load_model(" Q1 2025 ", model_dir).name == "Q1 2025"
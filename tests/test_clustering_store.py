@@ -0,0 +1,31 @@
+import os
+import pickle
+
+import pytest
+
+from clustering_store import ClusteringResultStore
+
+
+def test_get_drops_unpicklable_spill(tmp_path):
+    store = ClusteringResultStore(cache_dir=str(tmp_path))
+    store.put('abc', {'clusters': [0, 1]})
+    path = store._path('abc')
+    with open(path, 'wb') as handle:
+        handle.write(pickle.PROTO + bytes([4]) + b'\xff garbage')
+
+    fresh = ClusteringResultStore(cache_dir=str(tmp_path))
+    assert fresh.get('abc') is None
+    assert fresh.misses == 1
+    assert not os.path.exists(path)
+    assert fresh.get_or_compute('abc', lambda: {'clusters': [1]}) == {'clusters': [1]}
+
+
+def test_failed_fit_releases_key_lock(tmp_path):
+    store = ClusteringResultStore(cache_dir=str(tmp_path))
+
+    def fail():
+        raise ValueError("nothing to cluster")
+
+    with pytest.raises(ValueError):
+        store.get_or_compute('abc', fail)
+    assert store._key_locks == {}
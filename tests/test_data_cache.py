@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from data_cache import DataCache
+
+
+def test_failed_compute_releases_key_lock():
+    cache = DataCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('key', fail)
+    assert cache._key_locks == {}
+    assert cache.get_or_compute('key', lambda: 1) == 1
+
+
+def test_waiter_that_finds_the_entry_counts_a_hit():
+    cache = DataCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+        return 'value'
+
+    first = threading.Thread(target=cache.get_or_compute, args=('key', slow))
+    first.start()
+    started.wait()
+    waiter = threading.Thread(target=cache.get_or_compute, args=('key', lambda: 'again'))
+    waiter.start()
+    release.set()
+    first.join()
+    waiter.join()
+
+    assert cache.get('key') == 'value'
+    assert (cache.hits, cache.misses) == (2, 1)
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from dtype_schema import infer_schema, optimize_frame
+
+
+def test_date_names_match_whole_tokens():
+    df = pd.DataFrame({
+        'date': ['01-01-2025', '02-01-2025'] * 3,
+        'update_date': ['01-01-2025', '02-01-2025'] * 3,
+        'updates': ['yes', 'no'] * 3,
+        'lifetime': ['short', 'long'] * 3,
+    })
+
+    plan = infer_schema(df)
+
+    assert plan['date'] == 'datetime'
+    assert plan['update_date'] == 'datetime'
+    assert plan['updates'] == 'category'
+    assert plan['lifetime'] == 'category'
+
+
+def test_unparseable_date_column_falls_back_to_category():
+    df = pd.DataFrame({'time_slot': ['morning', 'evening'] * 10})
+
+    optimized, _ = optimize_frame(df)
+
+    assert isinstance(optimized['time_slot'].dtype, pd.CategoricalDtype)